@@ -1,27 +1,35 @@
 import streamlit as st
 
+from portfolio.spans import begin_rerun, breakdown, span, to_jsonl
+from views import about_me, project_1, project_2, project_3
+
 # --- PAGE SETUP ---
+# Pages are render functions of imported modules, so a rerun only calls render()
 about_page = st.Page(
-    page="views/about_me.py",
+    page=about_me.render,
+    url_path="about_me",
     title="About Me",
     icon=":material/account_circle:",
     default=True
 )
 
 project_1_page = st.Page(
-    page="views/project_1.py",
+    page=project_1.render,
+    url_path="project_1",
     title="Project 1",
     icon=":material/bar_chart:"
 )
 
 project_2_page = st.Page(
-    page="views/project_2.py",
+    page=project_2.render,
+    url_path="project_2",
     title="Project 2",
     icon=":material/bar_chart:"
 )
 
 project_3_page = st.Page(
-    page="views/project_3.py",
+    page=project_3.render,
+    url_path="project_3",
     title="Project 3",
     icon=":material/bar_chart:"
 )
@@ -50,5 +58,39 @@ source code, I opted for Matplotlib and Seaborn since GitHub does not directly r
 """, unsafe_allow_html=True)
 
 # --- RUN NAVIGATION ---
-pg.run()
+# Every section timed during this run is recorded under the page's rerun
+begin_rerun(pg.title)
+with span(f"page {pg.title}"):
+    pg.run()
+
+
+# --- DEBUG PANEL (add ?debug to the URL) ---
+if "debug" in st.query_params:
+    from portfolio.black_pearl import get_aggregate_cache
+    from portfolio.db import get_database
+    from portfolio.dtypes import memory_report
+    from portfolio.figures import get_figure_cache, open_figure_count
+    from portfolio.lazy import import_times
+    from portfolio.storage import load_reports
+
+    with st.sidebar.expander("Figure cache", expanded=True):
+        st.dataframe(get_figure_cache().stats(), hide_index=True)
+        st.caption(f"Open Matplotlib figures: {open_figure_count()}")
+
+    with st.sidebar.expander("Filtered aggregates"):
+        st.json(get_aggregate_cache().stats())
+
+    with st.sidebar.expander("Dataset memory"):
+        # Bytes per column of the registered tables, as planned vs with the pandas defaults
+        st.dataframe(memory_report({name: table for name, (_, table) in get_database().tables.items()}), hide_index=True)
+
+    with st.sidebar.expander("Data loads"):
+        # Whether each source came from its Arrow sidecar or was parsed, and how long it took
+        st.dataframe(load_reports(), hide_index=True)
+
+    with st.sidebar.expander("Lazy imports"):
+        st.dataframe(import_times(), hide_index=True)
 
+    with st.sidebar.expander("Timing", expanded=True):
+        st.dataframe(breakdown(), hide_index=True)
+        st.download_button("Export spans (JSONL)", to_jsonl(), file_name="spans.jsonl", mime="application/x-ndjson")
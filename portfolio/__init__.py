@@ -0,0 +1 @@
+"""Shared data and caching helpers for the portfolio pages."""
@@ -0,0 +1,83 @@
+"""Versioned artifacts produced by `python -m portfolio.build`.
+
+A build writes every rendered chart and aggregate table into
+ARTIFACTS_DIR/<build id>/ together with a manifest, then points
+ARTIFACTS_DIR/current at it. At runtime the render caches and aggregate
+registration look here first and only compute what is missing or stale.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from portfolio.storage import read_ipc, write_ipc
+
+ARTIFACTS_DIR = Path("./artifacts")
+
+SUFFIXES = {"json": ".json", "html": ".html", "png": ".png"}
+
+
+class Artifacts:
+    def __init__(self, root=ARTIFACTS_DIR):
+        self.root = Path(root)
+        self.build_dir = None
+        self.manifest = {"charts": {}, "tables": {}}
+        pointer = self.root / "current"
+        if pointer.exists():
+            self.build_dir = self.root / pointer.read_text().strip()
+            self.manifest = json.loads((self.build_dir / "manifest.json").read_text())
+
+    def chart(self, chart_id, key):
+        """The stored render of `chart_id` if it was built for `key`, else None."""
+        entry = self.manifest["charts"].get(chart_id)
+        if entry is None or entry["key"] != json.loads(json.dumps(key)):
+            return None
+        path = self.build_dir / entry["file"]
+        return path.read_bytes() if entry["kind"] == "png" else path.read_text()
+
+    def table(self, name, version):
+        """The stored Arrow table `name` if it was built for `version`, else None."""
+        entry = self.manifest["tables"].get(name)
+        if entry is None or entry["version"] != version:
+            return None
+        return read_ipc(self.build_dir / entry["file"])
+
+
+@st.cache_resource
+def get_artifacts():
+    return Artifacts()
+
+
+def write_build(charts, tables, root=ARTIFACTS_DIR):
+    """Write a build and make it current.
+
+    `charts` maps chart id -> (kind, key, render); `tables` maps
+    name -> (version, Arrow table). Returns the build directory.
+    """
+    keys = {"charts": {c: k for c, (_, k, _) in charts.items()}, "tables": {n: v for n, (v, _) in tables.items()}}
+    build_id = hashlib.sha1(json.dumps(keys, sort_keys=True).encode()).hexdigest()[:12]
+    build_dir = Path(root) / build_id
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {"build": build_id, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "charts": {}, "tables": {}}
+    for chart_id, (kind, key, render) in charts.items():
+        name = chart_id + SUFFIXES[kind]
+        if kind == "png":
+            (build_dir / name).write_bytes(render)
+        else:
+            (build_dir / name).write_text(render)
+        manifest["charts"][chart_id] = {"kind": kind, "key": key, "file": name}
+    for table_name, (version, table) in tables.items():
+        name = table_name + ".arrow"
+        write_ipc(table, build_dir / name)
+        manifest["tables"][table_name] = {"version": version, "file": name, "rows": table.num_rows}
+    (build_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    pointer = Path(root) / "current"
+    tmp = pointer.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(build_id)
+    tmp.replace(pointer)
+    return build_dir
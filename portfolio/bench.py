@@ -0,0 +1,202 @@
+"""Headless page benchmarks with AppTest.
+
+    python -m portfolio.bench [--runs 5] [--threshold 0.2] [--save-baseline] [page ...]
+
+Every run starts a fresh interpreter, renders the page once cold (empty
+in-process caches, as after a server start) and once warm (a rerun), and
+records wall time and peak RSS of each render. A second interpreter per run
+repeats the renders under tracemalloc, which slows them down too much to
+time, and records the memory each render allocated and still holds and its
+peak traced memory. Results are written to benchmarks/results.json and
+compared with benchmarks/baseline.json; the exit status is 1 if the median
+time, the peak RSS or the peak traced memory of any page grew by more than
+the threshold.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path("./benchmarks")
+RESULTS_PATH = BENCH_DIR / "results.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+PHASES = ["cold", "warm"]
+# Metrics compared with the baseline, and how the runs of each are summarized
+GATED = {"seconds": statistics.median, "peak_rss_mb": max, "peak_traced_mb": max}
+
+
+# --- MEASUREMENT (runs inside the worker interpreter) ---
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter, where Linux allows it."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # Kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def render(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def measure(at):
+    """Run `at` once and return its wall time and peak RSS."""
+    reset_peak_rss()
+    start = time.perf_counter()
+    render(at)
+    return {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+
+
+def measure_traced(at):
+    """Run `at` once under tracemalloc and return the memory it allocated and still holds, and its peak."""
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    render(at)
+    after, peak = tracemalloc.get_traced_memory()
+    return {"allocated_mb": (after - before) / 2**20, "peak_traced_mb": (peak - before) / 2**20}
+
+
+def worker(page, traced=False):
+    """Render `page` cold then warm in this interpreter and print the measurements."""
+    from streamlit.testing.v1 import AppTest
+
+    from portfolio.build import page_script
+
+    # Load the Streamlit runtime modules every page shares, outside the measurement
+    AppTest.from_string(page_script("views.about_me")).run()
+
+    at = AppTest.from_string(page_script(page), default_timeout=600)
+    if traced:
+        tracemalloc.start()
+    print(json.dumps({phase: (measure_traced if traced else measure)(at) for phase in PHASES}))
+
+
+# --- SUITE ---
+def run_page(page, runs):
+    """Measurements of `page` over `runs` fresh interpreters, per phase."""
+    samples = {phase: [] for phase in PHASES}
+    for _ in range(runs):
+        timed, traced = (run_worker(page, flags) for flags in [[], ["--traced"]])
+        for phase in PHASES:
+            samples[phase].append({**timed[phase], **traced[phase]})
+    return {phase: summarize(samples[phase]) for phase in PHASES}
+
+
+def run_worker(page, flags):
+    """The cold and warm measurements of `page` from one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-m", "portfolio.bench", "--worker", page, *flags],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    summary = {metric: reduce([run[metric] for run in runs]) for metric, reduce in GATED.items()}
+    summary["allocated_mb"] = statistics.median(run["allocated_mb"] for run in runs)
+    summary["runs"] = runs
+    return summary
+
+
+def compare(results, baseline, threshold):
+    """Rows comparing each gated metric with the baseline; `regressed` marks growth above `threshold`."""
+    rows = []
+    for page, phases in results["pages"].items():
+        for phase, summary in phases.items():
+            for metric in GATED:
+                before = baseline.get("pages", {}).get(page, {}).get(phase, {}).get(metric)
+                after = summary[metric]
+                change = after / before - 1 if before else None
+                rows.append({
+                    "page": page,
+                    "phase": phase,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": change,
+                    "regressed": change is not None and change > threshold,
+                })
+    return rows
+
+
+def print_report(results, rows):
+    for page, phases in results["pages"].items():
+        for phase, summary in phases.items():
+            print(
+                f"{page:<20}{phase:<6}{summary['seconds']:8.3f}s"
+                f"{summary['peak_rss_mb']:9.1f} MB RSS{summary['peak_traced_mb']:9.1f} MB traced peak"
+                f"{summary['allocated_mb']:9.1f} MB held"
+            )
+    for row in rows:
+        if row["change"] is None:
+            continue
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(f"{row['page']:<20}{row['phase']:<6}{row['metric']:<16}{row['change']:+8.1%} {flag}")
+
+
+def main(argv=None):
+    from portfolio.build import PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative growth (default 0.2)")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.traced)
+        return 0
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": args.runs,
+        "pages": {page: run_page(page, args.runs) for page in args.pages},
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    rows = compare(results, baseline, args.threshold)
+    print_report(results, rows)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,501 @@
+"""Black Pearl coffee shop sales: loading, feature engineering and aggregates.
+
+The six-month workbook is the base of the columnar store. Daily exports
+dropped into INCOMING_DIR are appended incrementally: only rows past the
+recorded high-water mark are read, stored as Arrow segments, and folded into
+the aggregate cube without a full rebuild.
+"""
+import json
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from portfolio.artifacts import get_artifacts
+from portfolio.db import get_database, sql
+from portfolio.dtypes import SALES_PLAN, apply_plan
+from portfolio.forecast import MODELS, SEASONS, fit_best, fits_from_table, fits_to_table
+from portfolio.lru import LRUCache
+from portfolio.spans import span
+from portfolio.storage import CACHE_DIR, file_version, load_columnar, read_ipc, write_ipc
+
+SALES_PATH = "./assets/Black_Pearl_Sales.xlsx"
+
+# Daily transaction exports (CSV, same columns as the workbook)
+INCOMING_DIR = "./assets/black_pearl_incoming"
+STORE_DIR = CACHE_DIR / "black_pearl"
+
+DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+HOURS = 24
+
+
+def add_features(sales):
+    """Arrow table `sales` with the derived columns the dashboard uses appended."""
+    transaction_time = sales["transaction_time"]
+    if not pa.types.is_time(transaction_time.type):
+        transaction_time = pc.strptime(transaction_time, format="%H:%M:%S", unit="s")
+    # Revenue
+    revenue = pc.multiply(sales["transaction_qty"].cast(pa.float64()), sales["unit_price"].cast(pa.float64()))
+    # Name of the day, built from the weekday codes instead of per-row strings
+    days = pa.array(DAYS_ORDER)
+    weekdays = pc.day_of_week(sales["transaction_date"])
+    day_of_week = pa.chunked_array(
+        [pa.DictionaryArray.from_arrays(chunk.cast(pa.int8()), days) for chunk in weekdays.chunks],
+        type=pa.dictionary(pa.int8(), pa.string()),
+    )
+    return (
+        sales
+        .append_column("revenue", revenue.cast(pa.float32()))
+        # The hour of the transactions
+        .append_column("transaction_hour", pc.hour(transaction_time).cast(pa.int8()))
+        .append_column("day_of_week", day_of_week)
+    )
+
+
+def read_sales(path):
+    """The workbook at `path` with its derived columns, as stored in the sidecar."""
+    with span("sales.features") as features:
+        table = add_features(pa.Table.from_pandas(pd.read_excel(path), preserve_index=False))
+        features.rows = table.num_rows
+    return table
+
+
+# The memory-mapped sidecar, shared by every session without copying. The
+# derived columns are computed once, when the sidecar is written.
+@st.cache_resource
+def load_sales(version):
+    table, _ = load_columnar(SALES_PATH, read_sales, plan=SALES_PLAN)
+    return table
+
+
+def weekday_hour_grid(weekdays, hours, values):
+    """Dense 7 x 24 array of `values` summed by ISO weekday (1 = Monday) and hour of day."""
+    grid = np.zeros((len(DAYS_ORDER), HOURS))
+    np.add.at(grid, (np.asarray(weekdays) - 1, np.asarray(hours)), values)
+    return grid
+
+
+# --- AGGREGATE CUBE ---
+# Every dashboard chart reads from this small table, built in a single scan.
+# {where} optionally restricts the scan to the transactions matching a filter.
+CUBE_QUERY = """
+SELECT
+    CASE
+        WHEN GROUPING(product_detail) = 0 THEN 'product_detail'
+        WHEN GROUPING(product_category) = 0 THEN 'product_category'
+        WHEN GROUPING(store_location) = 0 AND GROUPING(transaction_hour) = 0 THEN 'location_weekday_hour'
+        WHEN GROUPING(store_location) = 0 THEN 'store_location'
+        WHEN GROUPING(transaction_hour) = 0 THEN 'weekday_hour'
+        ELSE 'transaction_date'
+    END AS grouping_set,
+    product_detail,
+    product_category,
+    store_location,
+    day_of_week,
+    transaction_hour,
+    transaction_date,
+    SUM(transaction_qty)::BIGINT AS total_qty,
+    SUM(revenue) AS total_revenue
+FROM sales
+{where}
+GROUP BY GROUPING SETS (
+    (product_detail),
+    (product_category),
+    (store_location),
+    (store_location, day_of_week, transaction_hour),
+    (day_of_week, transaction_hour),
+    (transaction_date)
+)
+"""
+# The grouping_set labels of CUBE_QUERY; a stored cube missing any of them is stale
+CUBE_SETS = {
+    "product_detail",
+    "product_category",
+    "location_weekday_hour",
+    "store_location",
+    "weekday_hour",
+    "transaction_date",
+}
+
+
+# The cube only holds sums, so appended rows are folded in by re-summing
+# the old cube together with the cube of the new rows
+CUBE_MERGE_QUERY = """
+SELECT
+    grouping_set,
+    product_detail,
+    product_category,
+    store_location,
+    day_of_week,
+    transaction_hour,
+    transaction_date,
+    SUM(total_qty)::BIGINT AS total_qty,
+    SUM(total_revenue) AS total_revenue
+FROM (
+    SELECT * FROM old_cube
+    UNION ALL
+    SELECT * FROM new_cube
+)
+GROUP BY ALL
+"""
+
+
+@span("sales.cube")
+def build_cube(sales):
+    con = duckdb.connect(":memory:")
+    try:
+        con.register("sales", sales)
+        return con.sql(CUBE_QUERY.format(where="")).arrow()
+    finally:
+        con.close()
+
+
+def merge_cubes(old_cube, new_cube):
+    con = duckdb.connect(":memory:")
+    try:
+        con.register("old_cube", old_cube)
+        con.register("new_cube", new_cube)
+        return con.sql(CUBE_MERGE_QUERY).arrow()
+    finally:
+        con.close()
+
+
+# --- INCREMENTAL STORE ---
+class SalesStore:
+    """Columnar store of the base workbook plus appended daily segments.
+
+    The watermark (highest transaction_id and its date), the appended
+    segments and the incoming files already seen are persisted under
+    STORE_DIR, so a restart does not re-read old exports.
+    """
+
+    def __init__(self, store_dir=STORE_DIR, incoming_dir=INCOMING_DIR):
+        self.store_dir = Path(store_dir)
+        self.incoming_dir = Path(incoming_dir)
+        self._lock = threading.Lock()
+        self.base_version = None
+        self.segments = []
+        self.cube = None
+        self.state = None
+
+    @property
+    def version(self):
+        return f"{self.base_version}-{self.state['transaction_id']}"
+
+    @property
+    def table(self):
+        """Every transaction, as one Arrow table over the base and appended segments."""
+        return pa.concat_tables(self.segments)
+
+    def _state_path(self):
+        return self.store_dir / "watermark.json"
+
+    def _save_state(self):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path().with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2))
+        tmp.replace(self._state_path())
+
+    def _load_base(self, base_version):
+        """Load the workbook and any segments appended on top of this version of it."""
+        base = load_sales(base_version)
+        self.segments = [base]
+        self.base_version = base_version
+        self.state = {
+            "base_version": base_version,
+            "transaction_id": int(pc.max(base["transaction_id"]).as_py()),
+            "transaction_date": str(pc.max(base["transaction_date"]).as_py().date()),
+            "segments": [],
+            "files": {},
+        }
+
+        if self._state_path().exists():
+            saved = json.loads(self._state_path().read_text())
+            if saved["base_version"] == base_version:
+                self.state = saved
+                self.segments += [read_ipc(self.store_dir / name) for name in saved["segments"]]
+            else:
+                # The workbook itself changed; appended segments no longer apply
+                for name in saved["segments"]:
+                    (self.store_dir / name).unlink(missing_ok=True)
+        self.cube = get_artifacts().table("sales_cube", self.version)
+        if self.cube is None or set(pc.unique(self.cube["grouping_set"]).to_pylist()) != CUBE_SETS:
+            self.cube = build_cube(self.table)
+        self._save_state()
+
+    def _new_files(self):
+        """Incoming files that are new or changed since they were last read."""
+        seen = self.state["files"]
+        for path in sorted(self.incoming_dir.glob("*.csv")):
+            stat = path.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if seen.get(path.name) != signature:
+                yield path, signature
+
+    def _read_new_rows(self, paths):
+        """Rows of `paths` past the watermark, in the base table's column types.
+
+        Columns are read as text and cast with the sales dtype plan, so values
+        like transaction_time keep the same representation as the base rows.
+        """
+        schema = self.segments[0].schema
+        raw = [name for name in schema.names if name not in ("revenue", "transaction_hour", "day_of_week")]
+        raw_plan = {name: kind for name, kind in SALES_PLAN.items() if name in raw}
+        con = duckdb.connect(":memory:")
+        try:
+            rows = con.sql(
+                """
+                SELECT DISTINCT ON (transaction_id::BIGINT) *
+                FROM read_csv(?, header = true, union_by_name = true, all_varchar = true)
+                WHERE transaction_id::BIGINT > ?
+                ORDER BY transaction_id::BIGINT
+                """,
+                params=[[str(path) for path in paths], self.state["transaction_id"]],
+            ).arrow()
+        finally:
+            con.close()
+        if rows.num_rows == 0:
+            return None
+        # Categoricals take their dictionaries from the new rows, so unseen products are kept
+        rows = add_features(apply_plan(rows.select(raw), raw_plan))
+        return rows.cast(schema)
+
+    def refresh(self):
+        """Bring the store up to date and return its data version.
+
+        A changed workbook triggers a full rebuild; new incoming rows are
+        appended as a segment and merged into the cube.
+        """
+        with self._lock, span("sales.refresh"):
+            base_version = file_version(SALES_PATH)
+            if base_version != self.base_version:
+                self._load_base(base_version)
+
+            new_files = list(self._new_files())
+            if not new_files:
+                return self.version
+
+            rows = self._read_new_rows([path for path, _ in new_files])
+            if rows is not None:
+                name = f"segment-{self.state['transaction_id'] + 1:012d}.arrow"
+                write_ipc(rows, self.store_dir / name)
+                self.segments.append(read_ipc(self.store_dir / name))
+                self.cube = merge_cubes(self.cube, build_cube(rows))
+                self.state["segments"].append(name)
+                self.state["transaction_id"] = int(pc.max(rows["transaction_id"]).as_py())
+                self.state["transaction_date"] = str(pc.max(rows["transaction_date"]).as_py().date())
+            for path, signature in new_files:
+                self.state["files"][path.name] = signature
+            self._save_state()
+            return self.version
+
+
+@st.cache_resource
+def get_sales_store():
+    return SalesStore()
+
+
+def register_sales(database):
+    """Refresh the sales store and register `sales` and `sales_cube` for its version.
+
+    Returns the data version.
+    """
+    store = get_sales_store()
+    version = store.refresh()
+    if not database.is_registered("sales_cube", version):
+        database.register("sales", store.table, version)
+        database.register("sales_cube", store.cube, version)
+    return version
+
+
+# --- FILTERS ---
+# Filtered aggregates kept across sessions; each entry holds a few small frames
+AGGREGATE_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class SalesFilter:
+    """A normalized filter selection; the default keeps every transaction."""
+    start: date = None
+    end: date = None
+    locations: tuple = ()
+    categories: tuple = ()
+
+
+@st.cache_data
+def filter_options(version):
+    """Date range, store locations and product categories of the sales at `version`."""
+    dates = sql(
+        """
+        SELECT MIN(transaction_date)::DATE AS first, MAX(transaction_date)::DATE AS last
+        FROM sales_cube
+        WHERE grouping_set = 'transaction_date'
+        """,
+        fmt="arrow",
+    )
+    locations = sql("SELECT store_location FROM sales_cube WHERE grouping_set = 'store_location' ORDER BY 1")
+    categories = sql("SELECT product_category FROM sales_cube WHERE grouping_set = 'product_category' ORDER BY 1")
+    return {
+        "first": dates["first"][0].as_py(),
+        "last": dates["last"][0].as_py(),
+        "locations": locations["store_location"].tolist(),
+        "categories": categories["product_category"].tolist(),
+    }
+
+
+def normalize_filter(options, start, end, locations, categories):
+    """SalesFilter for a selection, dropping the parts that keep every row.
+
+    Equivalent selections (e.g. every location ticked, or none) map to the
+    same filter, so they share one cached result.
+    """
+    def subset(selected, every):
+        selected = tuple(sorted(set(selected)))
+        return () if set(selected) >= set(every) else selected
+
+    return SalesFilter(
+        start=start if start and start > options["first"] else None,
+        end=end if end and end < options["last"] else None,
+        locations=subset(locations, options["locations"]),
+        categories=subset(categories, options["categories"]),
+    )
+
+
+def filter_predicates(filters):
+    """WHERE clause and parameters selecting the transactions matching `filters`."""
+    clauses, params = [], []
+    if filters.start:
+        clauses.append("transaction_date >= ?")
+        params.append(filters.start)
+    if filters.end:
+        clauses.append("transaction_date < ?")
+        params.append(filters.end + timedelta(days=1))
+    for column, values in [("store_location", filters.locations), ("product_category", filters.categories)]:
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def filtered_cube(filters):
+    """The aggregate cube of the transactions matching `filters`.
+
+    An empty filter reuses the registered cube; otherwise the predicates are
+    pushed into a scan of the sales view.
+    """
+    if filters == SalesFilter():
+        return sql("SELECT * FROM sales_cube", fmt="arrow")
+    where, params = filter_predicates(filters)
+    with span("sales.filtered_cube") as cube_span:
+        cube = sql(CUBE_QUERY.format(where=where), fmt="arrow", params=params)
+        cube_span.rows = cube.num_rows
+    return cube
+
+
+@st.cache_data
+def weekday_hour_grids(version):
+    """7 x 24 weekday x hour revenue grid of each store location at `version`.
+
+    Read from the per-location grouping set of the registered cube, so it
+    costs 168 cube rows per location instead of a scan of the transactions.
+    """
+    rows = sql(
+        """
+        SELECT
+            store_location::VARCHAR AS store_location,
+            list_position(?, day_of_week::VARCHAR) AS weekday,
+            transaction_hour,
+            total_revenue
+        FROM sales_cube
+        WHERE grouping_set = 'location_weekday_hour'
+        """,
+        params=[DAYS_ORDER],
+    )
+    grids = {}
+    for location in np.unique(rows["store_location"]):
+        at = rows["store_location"] == location
+        grids[location] = weekday_hour_grid(rows["weekday"][at], rows["transaction_hour"][at], rows["total_revenue"][at])
+    return grids
+
+
+def filtered_weekday_hour_grid(version, filters):
+    """The weekday x hour grid of `filters`, summed from the per-location grids.
+
+    None when `filters` also restricts dates or categories, which the
+    per-location grids cannot answer.
+    """
+    if filters.start or filters.end or filters.categories:
+        return None
+    grids = weekday_hour_grids(version)
+    return sum((grids[location] for location in filters.locations or grids), np.zeros((len(DAYS_ORDER), HOURS)))
+
+
+@st.cache_resource
+def get_aggregate_cache(maxsize=AGGREGATE_CACHE_SIZE):
+    return LRUCache(maxsize)
+
+
+# --- FORECAST ---
+# Days forecast past the last transaction: the next half year
+FORECAST_HORIZON = 184
+ALL_LOCATIONS = "All locations"
+
+
+def daily_sales():
+    """Daily revenue in total and per store location, one column each, gaps interpolated."""
+    frame = sql(
+        """
+        SELECT transaction_date, store_location, SUM(revenue) AS sales
+        FROM sales
+        GROUP BY ALL
+        """,
+        fmt="df",
+    )
+    daily = frame.pivot(index="transaction_date", columns="store_location", values="sales").asfreq("D")
+    daily.insert(0, ALL_LOCATIONS, daily.sum(axis=1, min_count=1))
+    daily.columns.name = None
+    return daily.interpolate(limit_direction="both")
+
+
+def register_forecast(database, version, horizon=FORECAST_HORIZON, models=MODELS, seasons=tuple(SEASONS)):
+    """Register `sales_forecast_fits` and `sales_forecast` for the sales at `version`.
+
+    Every series gets the best of `models` x `seasons`, each fitted over the
+    parameter grid. Both tables are taken from the build artifacts when they
+    match. Returns the key they are registered under.
+    """
+    key = f"{version}:{horizon}:{','.join(models)}:{','.join(seasons)}"
+    if database.is_registered("sales_forecast", key):
+        return key
+    fits = get_artifacts().table("sales_forecast_fits", key)
+    forecast = get_artifacts().table("sales_forecast", key)
+    if fits is None or forecast is None:
+        with span("sales.forecast") as forecast_span:
+            history = daily_sales()
+            fitted = fit_best({name: history[name].to_numpy(dtype=float) for name in history}, models, seasons)
+            fits = fits_to_table(fitted)
+            dates = pd.date_range(history.index[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+            forecast = pa.table({
+                "date": pa.array(dates.to_numpy()),
+                **{name: fit.forecast(horizon) for name, fit in fitted.items() if fit},
+            })
+            forecast_span.rows = len(history) * len(fitted)
+    database.register("sales_forecast_fits", fits, key)
+    database.register("sales_forecast", forecast, key)
+    return key
+
+
+@st.cache_data
+def sales_forecast(key):
+    """The daily history, forecasts (same columns) and fits registered under `key`."""
+    database = get_database()
+    fits = fits_from_table(database.tables["sales_forecast_fits"][1])
+    forecast = database.tables["sales_forecast"][1].to_pandas().set_index("date")
+    return daily_sales(), forecast, fits
@@ -0,0 +1,51 @@
+"""Precompute every portfolio page into a versioned artifacts directory.
+
+    python -m portfolio.build
+
+Each page is run once headlessly, which fills the render caches and registers
+the aggregate tables. Their contents are then written out with a manifest,
+so the server only loads artifacts on cold start.
+"""
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from portfolio.artifacts import write_build
+from portfolio.db import get_database
+from portfolio.figures import get_figure_cache
+
+PAGES = ["views.project_1", "views.project_2", "views.project_3"]
+
+# Aggregate tables persisted alongside the rendered charts
+TABLES = ["sales_cube", "covid_monthly", "sales_forecast_fits", "sales_forecast"]
+
+
+def page_script(page):
+    """A script that renders the page module `page`, as app.py's navigation does."""
+    return f"from {page} import render\n\nrender()\n"
+
+
+def run_page(page, timeout=600):
+    start = time.perf_counter()
+    at = AppTest.from_string(page_script(page), default_timeout=timeout)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page} failed: {at.exception[0].value}")
+    return time.perf_counter() - start
+
+
+def main():
+    for page in PAGES:
+        print(f"{page}: {run_page(page):.2f}s")
+
+    charts = get_figure_cache().entries()
+    database = get_database()
+    tables = {name: database.tables[name] for name in TABLES if name in database.tables}
+    build_dir = write_build(charts, tables)
+    print(f"Wrote {len(charts)} charts and {len(tables)} tables to {build_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
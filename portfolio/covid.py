@@ -0,0 +1,178 @@
+"""Indonesian COVID-19 time series: loading, cleaning and the case map."""
+import duckdb
+import streamlit as st
+
+from portfolio.artifacts import get_artifacts
+from portfolio.db import get_database
+from portfolio.dtypes import COVID_PLAN, apply_plan
+from portfolio.figures import get_figure_cache
+from portfolio.lazy import lazy_import
+from portfolio.spans import span
+
+folium = lazy_import("folium")
+
+COVID_PATH = "./assets/covid_19_indonesia_time_series_all.csv"
+
+# Source column -> (clean name, DuckDB type). Only these columns are parsed.
+COLUMNS = {
+    "Date": ("date", "DATE"),
+    "Location": ("location", "VARCHAR"),
+    "Island": ("island", "VARCHAR"),
+    "New Cases": ("new_cases", "BIGINT"),
+    "New Deaths": ("new_deaths", "BIGINT"),
+    "New Recovered": ("new_recovered", "BIGINT"),
+    "Total Cases": ("total_cases", "BIGINT"),
+    "Population Density": ("population_density", "DOUBLE"),
+    "Longitude": ("longitude", "DOUBLE"),
+    "Latitude": ("latitude", "DOUBLE"),
+}
+
+
+def covid_query(path):
+    """Province-level rows with clean column names, filtered during the CSV scan."""
+    select = ",\n        ".join(f'"{source}" AS {name}' for source, (name, _) in COLUMNS.items())
+    types = {source: dtype for source, (_, dtype) in COLUMNS.items()}
+    types["Location Level"] = "VARCHAR"
+    return f"""
+    SELECT
+        {select}
+    FROM read_csv(
+        '{path}',
+        header = true,
+        dateformat = '%m/%d/%Y',
+        types = {types}
+    )
+    WHERE "Location Level" = 'Province'
+    """
+
+
+@st.cache_resource
+def load_covid(version):
+    """The cleaned province table as Arrow in its compact types, parsed once per data version."""
+    con = duckdb.connect(":memory:")
+    try:
+        with span("covid.load") as load:
+            table = apply_plan(con.sql(covid_query(COVID_PATH)).arrow(), COVID_PLAN)
+            load.rows = table.num_rows
+        return table
+    finally:
+        con.close()
+
+
+# --- MONTHLY ROLLUP ---
+# Every new_* metric per province and month, with the chart label, in one pass
+MONTHLY_QUERY = """
+SELECT
+    location,
+    island,
+    DATE_TRUNC('month', date) AS month,
+    STRFTIME(DATE_TRUNC('month', date), '%b %Y') AS month_year,
+    SUM(new_cases) AS new_cases,
+    SUM(new_deaths) AS new_deaths,
+    SUM(new_recovered) AS new_recovered
+FROM covid
+GROUP BY location, island, month
+ORDER BY month, location
+"""
+
+
+def register_covid(database, version):
+    """Register the `covid` table and its `covid_monthly` rollup for `version`.
+
+    The rollup is rebuilt only when the data version changes.
+    """
+    if database.is_registered("covid_monthly", version):
+        return
+    database.register("covid", load_covid(version), version)
+    monthly = get_artifacts().table("covid_monthly", version)
+    if monthly is None:
+        cursor = database.cursor()
+        with span("covid.monthly") as rollup:
+            monthly = cursor.sql(MONTHLY_QUERY).arrow()
+            rollup.rows = monthly.num_rows
+    database.register("covid_monthly", monthly, version)
+
+
+# --- CASE MAP ---
+# Above this many locations the map switches to grid-clustered markers
+CLUSTER_THRESHOLD = 500
+CLUSTER_ZOOMS = range(4, 13)
+CIRCLE_STYLE = dict(color="crimson", fill=True, fill_color="crimson")
+
+LOCATIONS_QUERY = """
+SELECT
+    location,
+    MAX(total_cases) AS total_cases,
+    AVG(latitude) AS latitude,
+    AVG(longitude) AS longitude
+FROM covid
+GROUP BY location
+"""
+
+# One point feature per location, built by DuckDB from whole columns. Each
+# feature carries its circle radius in properties.style, which Leaflet applies
+# through setStyle, and a preformatted tooltip.
+CASE_MAP_QUERY = f"""
+WITH locations AS ({LOCATIONS_QUERY})
+SELECT
+    json_object(
+        'type', 'FeatureCollection',
+        'features', list(json_object(
+            'type', 'Feature',
+            'geometry', json_object(
+                'type', 'Point',
+                'coordinates', [ROUND(longitude, 4), ROUND(latitude, 4)]
+            ),
+            'properties', json_object(
+                'tooltip', location || ': ' || total_cases || ' cases',
+                'style', json_object('radius', ROUND(total_cases / 5))
+            )
+        ))
+    ) AS geojson
+FROM locations
+"""
+
+
+def minify_html(html):
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def case_map_html(version):
+    """Standalone HTML of the case map, built once per data version."""
+    return get_figure_cache().get_html("case_map", version, lambda: build_case_map_html(version))
+
+
+@span("covid.map")
+def build_case_map_html(version):
+    """Render the case map.
+
+    Dense datasets are clustered on a grid per zoom level, so the number of
+    rendered markers stays bounded.
+    """
+    # geo subclasses a branca element at import time, so it is imported here
+    from portfolio.geo import add_clustered_circles
+
+    cursor = get_database().cursor()
+    locations = cursor.sql(LOCATIONS_QUERY).fetchnumpy()
+    center = [locations["latitude"].mean(), locations["longitude"].mean()]
+    m = folium.Map(location=center, zoom_start=5)
+
+    if len(locations["location"]) > CLUSTER_THRESHOLD:
+        add_clustered_circles(
+            m,
+            locations["latitude"],
+            locations["longitude"],
+            locations["total_cases"],
+            zooms=CLUSTER_ZOOMS,
+            **CIRCLE_STYLE,
+        )
+    else:
+        geojson = cursor.sql(CASE_MAP_QUERY).fetchone()[0]
+        folium.GeoJson(
+            geojson,
+            marker=folium.Circle(**CIRCLE_STYLE),
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+        ).add_to(m)
+
+    # Render the page itself rather than the iframe-in-iframe from _repr_html_
+    return minify_html(m.get_root().render())
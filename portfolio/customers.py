@@ -0,0 +1,109 @@
+"""E-commerce customers: loading and the cached pair plot."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from portfolio.dtypes import CUSTOMERS_PLAN, apply_plan
+from portfolio.figures import get_figure_cache
+from portfolio.lazy import lazy_import
+from portfolio.spans import span
+from portfolio.regression import bootstrap_file, confidence_intervals, fit_streaming
+
+CUSTOMERS_PATH = "./assets/Ecommerce Customers"
+
+# Above this many rows the pair plot switches to binned density images
+DENSITY_THRESHOLD = 100_000
+DENSITY_BINS = 64
+
+FEATURES = ["Avg. Session Length", "Time on App", "Time on Website", "Length of Membership"]
+TARGET = "Yearly Amount Spent"
+
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
+
+@st.cache_data
+def load_customers(version):
+    return apply_plan(pd.read_csv(CUSTOMERS_PATH), CUSTOMERS_PLAN).to_pandas()
+
+
+def register_customers(database, version):
+    """Register the `customers` table for `version`."""
+    if not database.is_registered("customers", version):
+        database.register("customers", load_customers(version), version)
+
+
+def bin_indices(values, bins):
+    """Bin every column of `values` into `bins` equal-width bins.
+
+    Returns the per-row bin index of each column and the bin edges.
+    """
+    lo = values.min(axis=0)
+    hi = values.max(axis=0)
+    width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+    index = np.clip(((values - lo) / width).astype(np.intp), 0, bins - 1)
+    edges = lo + width * np.arange(bins + 1)[:, None]
+    return index, edges
+
+
+def density_pairplot(frame, bins=DENSITY_BINS):
+    """Scatter matrix drawn as 2-D histogram images instead of individual points.
+
+    Each column pair is counted with a single np.bincount over the combined
+    bin indices, so draw time depends on `bins`, not on the number of rows.
+    """
+    numeric = frame.select_dtypes("number").dropna()
+    columns = numeric.columns
+    index, edges = bin_indices(numeric.to_numpy(dtype=float), bins)
+    n = len(columns)
+
+    fig, axes = plt.subplots(n, n, figsize=(2.5 * n, 2.5 * n), squeeze=False)
+    for row in range(n):
+        for col in range(n):
+            ax = axes[row, col]
+            x_edges, y_edges = edges[:, col], edges[:, row]
+            if row == col:
+                counts = np.bincount(index[:, col], minlength=bins)
+                ax.stairs(counts, x_edges, fill=True)
+            else:
+                counts = np.bincount(index[:, row] * bins + index[:, col], minlength=bins * bins)
+                ax.imshow(
+                    np.log1p(counts.reshape(bins, bins)),
+                    origin="lower",
+                    aspect="auto",
+                    extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+                    cmap="Blues",
+                )
+            ax.set_xlabel(columns[col] if row == n - 1 else "")
+            ax.set_ylabel(columns[row] if col == 0 else "")
+    fig.tight_layout()
+    return fig
+
+
+def pairplot_figure(version):
+    customers = load_customers(version)
+    with span("customers.pairplot", rows=len(customers)):
+        if len(customers) > DENSITY_THRESHOLD:
+            return density_pairplot(customers)
+        return sns.pairplot(customers).figure
+
+
+def pairplot_png(version):
+    """The pair plot of the numerical features, drawn once per data version."""
+    return get_figure_cache().get_png("pairplot", version, "default", lambda: pairplot_figure(version))
+
+
+@st.cache_data
+@span("customers.model")
+def spend_model(version):
+    """Linear model of Yearly Amount Spent, fitted once per data version."""
+    return fit_streaming(CUSTOMERS_PATH, FEATURES, TARGET)
+
+
+@st.cache_data
+@span("customers.bootstrap")
+def spend_model_intervals(version, n_resamples=1000, level=0.95):
+    """Bootstrap confidence intervals for the spend model coefficients."""
+    # Streamed over the file, so the whole extract is never loaded at once
+    betas = bootstrap_file(CUSTOMERS_PATH, FEATURES, TARGET, n_resamples)
+    return confidence_intervals(betas[:, 1:], FEATURES, level)
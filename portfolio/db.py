@@ -0,0 +1,106 @@
+"""Process-wide DuckDB connection shared by every Streamlit session.
+
+Datasets are registered once per data version as named Arrow-backed views.
+Each session queries them through its own cursor, so reruns never re-scan
+or re-convert the source frames.
+"""
+import threading
+from contextlib import contextmanager
+
+import duckdb
+import pyarrow as pa
+import streamlit as st
+
+from portfolio.spans import span
+
+
+class Database:
+    def __init__(self):
+        self.con = duckdb.connect(":memory:")
+        self._lock = threading.Lock()
+        # name -> (version, Arrow table); the tables stay alive while registered
+        self.tables = {}
+
+    def is_registered(self, name, version):
+        return self.tables.get(name, (None, None))[0] == version
+
+    def register(self, name, data, version):
+        """Register `data` as view `name`, unless this version is already registered."""
+        with self._lock:
+            if self.is_registered(name, version):
+                return False
+            if not isinstance(data, pa.Table):
+                data = pa.Table.from_pandas(data, preserve_index=False)
+            self.tables[name] = (version, data)
+            return True
+
+    def cursor(self):
+        return Cursor(self)
+
+
+class Cursor:
+    """A DuckDB cursor that keeps its views in sync with the shared tables.
+
+    Registered views are local to a DuckDB connection, so each cursor
+    registers the shared Arrow tables itself. This is zero-copy and happens
+    only when a table is new or its version changed.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.con = database.con.cursor()
+        self._versions = {}
+
+    def sql(self, query, params=None):
+        for name, (version, table) in list(self.database.tables.items()):
+            if self._versions.get(name) != version:
+                self.con.register(name, table)
+                self._versions[name] = version
+        return self.con.sql(query, params=params)
+
+
+@contextmanager
+def scratch_connection(**tables):
+    """A private in-memory connection with `tables` registered, closed on exit."""
+    con = duckdb.connect(":memory:")
+    try:
+        for name, table in tables.items():
+            con.register(name, table)
+        yield con
+    finally:
+        con.close()
+
+
+@st.cache_resource
+def get_database():
+    return Database()
+
+
+def session_cursor():
+    """The DuckDB cursor owned by the current session."""
+    database = get_database()
+    cursor = st.session_state.get("_duckdb_cursor")
+    if cursor is None or cursor.database is not database:
+        cursor = database.cursor()
+        st.session_state["_duckdb_cursor"] = cursor
+    return cursor
+
+
+def sql(query, fmt="numpy", params=None):
+    """Run `query` on the session cursor, binding `params` to its ? placeholders.
+
+    Results come back as a dict of NumPy arrays by default; use fmt="arrow"
+    for an Arrow table or fmt="df" when pandas-only operations follow.
+    """
+    with span("sql") as query_span:
+        rel = session_cursor().sql(query, params=params)
+        if fmt == "arrow":
+            result = rel.arrow()
+            query_span.rows = result.num_rows
+        elif fmt == "df":
+            result = rel.df()
+            query_span.rows = len(result)
+        else:
+            result = rel.fetchnumpy()
+            query_span.rows = len(next(iter(result.values()), ()))
+    return result
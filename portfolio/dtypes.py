@@ -0,0 +1,160 @@
+"""Compact column types for the cached datasets, and what they save.
+
+Each dataset declares a plan mapping columns to the type they are kept as:
+an Arrow type alias ("int8", "float32", "date32", ...) for downcasts and
+parsed dates, or "category" for dictionary-encoded low-cardinality strings.
+Columns not in the plan keep their type.
+
+    python -m portfolio.dtypes
+
+loads every dataset and prints its bytes per column with the plan and with
+the pandas defaults (int64, float64 and plain strings), in Arrow and as a
+pandas copy.
+"""
+import sys
+
+import pyarrow as pa
+
+# Workbook columns, then the ones derived by black_pearl.add_features
+SALES_PLAN = {
+    "transaction_id": "int32",
+    "transaction_date": "timestamp[ns]",
+    "transaction_qty": "int8",
+    "store_id": "int8",
+    "store_location": "category",
+    "product_id": "int16",
+    "unit_price": "float32",
+    "product_category": "category",
+    "product_type": "category",
+    "product_detail": "category",
+    "revenue": "float32",
+    "transaction_hour": "int8",
+    "day_of_week": "category",
+}
+
+COVID_PLAN = {
+    "date": "date32",
+    "location": "category",
+    "island": "category",
+    "new_cases": "int32",
+    "new_deaths": "int32",
+    "new_recovered": "int32",
+    "total_cases": "int32",
+    "population_density": "float32",
+    "longitude": "float32",
+    "latitude": "float32",
+}
+
+CUSTOMERS_PLAN = {
+    "Avatar": "category",
+    "Avg. Session Length": "float32",
+    "Time on App": "float32",
+    "Time on Website": "float32",
+    "Length of Membership": "float32",
+    "Yearly Amount Spent": "float32",
+}
+
+
+def dictionary_encode(column):
+    """`column` dictionary-encoded, with the narrowest index type that fits its dictionaries."""
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    size = max((len(chunk.dictionary) for chunk in column.chunks), default=0)
+    index_type = next(t for t in [pa.int8(), pa.int16(), pa.int32()] if size <= 2 ** (t.bit_width - 1))
+    return column.cast(pa.dictionary(index_type, column.type.value_type))
+
+
+def apply_plan(data, plan):
+    """`data` (Arrow or pandas) as an Arrow table with the columns in `plan` cast.
+
+    Casts are checked, so a value that does not fit its planned type raises
+    instead of wrapping around.
+    """
+    if not isinstance(data, pa.Table):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    # The pandas metadata would still describe the original dtypes
+    table = data.replace_schema_metadata(None)
+    for name, kind in plan.items():
+        column = table[name]
+        column = dictionary_encode(column) if kind == "category" else column.cast(pa.type_for_alias(kind))
+        table = table.set_column(table.schema.get_field_index(name), name, column)
+    return table
+
+
+def default_type(arrow_type):
+    """The type pandas would give a column by default: int64, float64 or plain strings."""
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_type.value_type
+    if pa.types.is_integer(arrow_type):
+        return pa.int64()
+    if pa.types.is_floating(arrow_type):
+        return pa.float64()
+    return arrow_type
+
+
+def type_name(arrow_type):
+    return f"category[{arrow_type.index_type}]" if pa.types.is_dictionary(arrow_type) else str(arrow_type)
+
+
+def pandas_bytes(column):
+    """Deep memory of `column` as a pandas Series."""
+    series = column.to_pandas(date_as_object=False)
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def memory_report(tables):
+    """Bytes per column of each Arrow table in `tables` (name -> table), compact vs default types."""
+    rows = []
+    for dataset, table in tables.items():
+        for field in table.schema:
+            column = table[field.name]
+            default = column.cast(default_type(field.type))
+            rows.append({
+                "dataset": dataset,
+                "column": field.name,
+                "type": type_name(field.type),
+                "default_type": type_name(default.type),
+                "bytes": column.nbytes,
+                "default_bytes": default.nbytes,
+                "pandas_bytes": pandas_bytes(column),
+                "pandas_default_bytes": pandas_bytes(default),
+            })
+    return rows
+
+
+def print_report(rows):
+    totals = {}
+    for row in rows:
+        print(
+            f"{row['dataset']:<10}{row['column']:<24}{row['default_type']:>14} -> {row['type']:<16}"
+            f"{row['default_bytes']:>12,} -> {row['bytes']:>12,}"
+            f"{row['pandas_default_bytes']:>14,} -> {row['pandas_bytes']:>12,}"
+        )
+        total = totals.setdefault(row["dataset"], [0, 0, 0, 0])
+        for i, key in enumerate(["default_bytes", "bytes", "pandas_default_bytes", "pandas_bytes"]):
+            total[i] += row[key]
+    for dataset, (default, compact, pandas_default, pandas_compact) in totals.items():
+        print(
+            f"{dataset}: Arrow {default / 2**20:.1f} MB -> {compact / 2**20:.1f} MB, "
+            f"pandas {pandas_default / 2**20:.1f} MB -> {pandas_compact / 2**20:.1f} MB"
+        )
+
+
+def main():
+    # Imported here: the dataset modules import the plans from this module
+    from portfolio.black_pearl import register_sales
+    from portfolio.covid import COVID_PATH, register_covid
+    from portfolio.customers import CUSTOMERS_PATH, register_customers
+    from portfolio.db import get_database
+    from portfolio.storage import file_version
+
+    database = get_database()
+    register_sales(database)
+    register_covid(database, file_version(COVID_PATH))
+    register_customers(database, file_version(CUSTOMERS_PATH))
+    print_report(memory_report({name: database.tables[name][1] for name in ["sales", "covid", "customers"]}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Paginated browser for a registered DuckDB view.
+
+Sorting, the text filter and LIMIT/OFFSET paging all run in DuckDB, so a
+session only ever receives one page of rows however large the table is.
+"""
+import pyarrow as pa
+import streamlit as st
+
+from portfolio.db import get_database, sql
+from portfolio.spans import span
+
+PAGE_SIZE = 100
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def text_columns(schema):
+    """Columns the text filter searches: strings and categoricals."""
+    return [
+        field.name
+        for field in schema
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type) or pa.types.is_dictionary(field.type)
+    ]
+
+
+def where_clause(schema, search):
+    """WHERE clause and parameters matching `search` in any text column."""
+    columns = text_columns(schema)
+    if not search or not columns:
+        return "", []
+    conditions = " OR ".join(f"CAST({quote(column)} AS VARCHAR) ILIKE ?" for column in columns)
+    return f"WHERE {conditions}", [f"%{search}%"] * len(columns)
+
+
+def page_query(table, schema, search, sort, descending, page, page_size, unique_key):
+    """SQL and parameters for one page of `table`.
+
+    Sorted pages end the ORDER BY with `unique_key`, so rows tied on the sort
+    column keep the same order from one page query to the next.
+    """
+    where, params = where_clause(schema, search)
+    order = ""
+    if sort:
+        order = f"ORDER BY {quote(sort)} {'DESC' if descending else 'ASC'}"
+        if sort != unique_key:
+            order += f", {quote(unique_key)}"
+    query = f"SELECT * FROM {quote(table)} {where} {order} LIMIT ? OFFSET ?"
+    return query, params + [page_size, (page - 1) * page_size]
+
+
+def data_explorer(table, key, unique_key, page_size=PAGE_SIZE):
+    """Show registered view `table` one page at a time, with sort and text filter controls.
+
+    `unique_key` names a column with a distinct value per row.
+    """
+    schema = get_database().tables[table][1].schema
+    page_key = f"{key}_page"
+
+    def first_page():
+        st.session_state[page_key] = 1
+
+    search_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1], vertical_alignment="bottom")
+    search = search_col.text_input("Filter", key=f"{key}_search", placeholder="Search text columns", on_change=first_page)
+    sort = sort_col.selectbox("Sort by", [None, *schema.names], key=f"{key}_sort", on_change=first_page)
+    descending = order_col.toggle("Descending", key=f"{key}_desc", on_change=first_page)
+
+    where, params = where_clause(schema, search)
+    total = sql(f"SELECT COUNT(*) AS n FROM {quote(table)} {where}", params=params)["n"][0]
+    pages = max(1, -(-int(total) // page_size))
+    # A narrower filter can leave the stored page past the end
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = page_col.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    with span(f"explorer {table}") as page_span:
+        query, params = page_query(table, schema, search, sort, descending, page, page_size, unique_key)
+        rows = sql(query, fmt="df", params=params)
+        page_span.rows = len(rows)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+    if total == 0:
+        st.caption("No matching rows")
+    else:
+        first = (page - 1) * page_size
+        st.caption(f"Rows {first + 1:,}–{first + len(rows):,} of {total:,} (page {page} of {pages})")
@@ -0,0 +1,199 @@
+"""Caches of rendered charts, keyed by chart id, data version and theme.
+
+Building and validating a Plotly figure is expensive, and so is serializing it
+for the browser. `plotly_chart` builds each figure once per data version,
+keeps its JSON spec, and replays that spec straight into the page on later
+reruns. `st.plotly_chart` re-validates a dict spec (about 10 ms per chart,
+against about 1 ms for the replay), so on the Streamlit versions listed in
+FAST_PATH_VERSIONS the replay fills the chart element itself, mirroring what
+Streamlit does internally. Any other version, or a change in those
+internals, falls back to the public `st.plotly_chart`.
+
+`pyplot_image` does the same for Matplotlib: each figure is drawn once per
+(data version, style), kept as PNG bytes and closed.
+
+Renders prebuilt by `python -m portfolio.build` are served from the
+artifacts directory when their key matches.
+"""
+import io
+import json
+import threading
+from collections import Counter
+
+import streamlit as st
+
+# Private Streamlit internals used by the chart replay; checked against FAST_PATH_VERSIONS
+try:
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+except ImportError:
+    PlotlyChartProto = None
+
+from portfolio.artifacts import get_artifacts
+from portfolio.lazy import lazy_import
+from portfolio.spans import span
+
+# Only needed when a chart is actually drawn, not when it is served from cache
+plt = lazy_import("matplotlib.pyplot")
+pio = lazy_import("plotly.io")
+Image = lazy_import("PIL.Image")
+
+# Streamlit releases whose plotly_chart internals the replay mirrors
+FAST_PATH_VERSIONS = ("1.40.",)
+FAST_PATH = PlotlyChartProto is not None and st.__version__.startswith(FAST_PATH_VERSIONS)
+
+# st.image resizes and re-encodes wider images on every call (Streamlit's
+# MAXIMUM_CONTENT_WIDTH), so cached PNGs are stored at most this wide
+MAX_IMAGE_WIDTH = 2 * 730
+
+
+class FigureCache:
+    def __init__(self, artifacts=None):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._kinds = {}
+        self.artifacts = artifacts
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, chart_id, key, render, kind):
+        """Return the cached render of a chart for `key`, calling `render()` only on a miss.
+
+        `kind` ("json", "png" or "html") says how the render is stored as a
+        build artifact. Prebuilt artifacts count as hits.
+        """
+        entry = self._entries.get((chart_id, key))
+        if entry is None and self.artifacts is not None:
+            entry = self.artifacts.chart(chart_id, key)
+            if entry is not None:
+                self._store(chart_id, key, entry, kind)
+        if entry is not None:
+            self.hits[chart_id] += 1
+            return entry
+
+        with span(f"draw {chart_id}"):
+            entry = render()
+        self._store(chart_id, key, entry, kind)
+        self.misses[chart_id] += 1
+        return entry
+
+    def _store(self, chart_id, key, entry, kind):
+        with self._lock:
+            # Drop renders left over from earlier data versions of this chart
+            for stale in [k for k in self._entries if k[0] == chart_id]:
+                del self._entries[stale]
+            self._entries[(chart_id, key)] = entry
+            self._kinds[chart_id] = kind
+
+    def entries(self):
+        """Every cached render as chart id -> (kind, key, render)."""
+        return {chart_id: (self._kinds[chart_id], key, entry) for (chart_id, key), entry in self._entries.items()}
+
+    def get_spec(self, chart_id, version, theme, build):
+        """JSON spec of the Plotly figure returned by `build()`."""
+        return self.get(chart_id, (version, theme), lambda: pio.to_json(build(), validate=False), "json")
+
+    def get_png(self, chart_id, version, style, build):
+        """PNG bytes of the Matplotlib figure returned by `build()`, drawn in `style`."""
+        def render():
+            with plt.style.context(style):
+                return figure_to_png(build())
+
+        return self.get(chart_id, (version, style), render, "png")
+
+    def get_html(self, chart_id, version, build):
+        """Standalone HTML returned by `build()`."""
+        return self.get(chart_id, (version,), build, "html")
+
+    def stats(self):
+        """Hit/miss counts and hit rate per chart."""
+        rows = []
+        for chart_id in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[chart_id], self.misses[chart_id]
+            rows.append({
+                "chart": chart_id,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses),
+            })
+        return rows
+
+
+def figure_to_png(fig, max_width=MAX_IMAGE_WIDTH):
+    """Render `fig` to compressed PNG bytes no wider than `max_width` and close it."""
+    buffer = io.BytesIO()
+    # Same rendering options st.pyplot uses
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight", pil_kwargs={"optimize": True})
+    plt.close(fig)
+
+    image = Image.open(buffer)
+    if image.width <= max_width:
+        return buffer.getvalue()
+    # Downscale once here, as st.image would otherwise do on every rerun
+    height = round(image.height * max_width / image.width)
+    buffer = io.BytesIO()
+    image.resize((max_width, height), resample=Image.BILINEAR).save(buffer, format="png", optimize=True)
+    return buffer.getvalue()
+
+
+def open_figure_count():
+    """Matplotlib figures currently open in this process; a growing count means a leak."""
+    return len(plt.get_fignums())
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(get_artifacts())
+
+
+def plotly_chart(chart_id, version, build, theme="streamlit", use_container_width=False, specs=None):
+    """Show the figure returned by `build()`, reusing its spec for the same data version.
+
+    Pass a dict as `specs` to keep the spec there instead of in the shared
+    figure cache, for renders tied to a short-lived key such as a filter.
+    """
+    with span(f"plotly_chart {chart_id}"):
+        if specs is None:
+            spec = get_figure_cache().get_spec(chart_id, version, theme, build)
+        elif chart_id in specs:
+            spec = specs[chart_id]
+        else:
+            with span(f"draw {chart_id}"):
+                spec = specs[chart_id] = pio.to_json(build(), validate=False)
+
+        if FAST_PATH:
+            try:
+                return _replay_spec(spec, theme, use_container_width)
+            except (AttributeError, TypeError, ValueError):
+                pass  # The internals changed within a listed release; use the public API
+        return st.plotly_chart(json.loads(spec), theme=theme, use_container_width=use_container_width)
+
+
+def _replay_spec(spec, theme, use_container_width):
+    """Enqueue a chart element holding the JSON `spec` as is, as st.plotly_chart does internally."""
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.theme = theme or ""
+    proto.form_id = current_form_id(st._main)
+    proto.spec = spec
+    proto.config = json.dumps({"showLink": False, "linkText": False})
+    proto.id = compute_and_register_element_id(
+        "plotly_chart",
+        user_key=None,
+        form_id=proto.form_id,
+        plotly_spec=proto.spec,
+        plotly_config=proto.config,
+        selection_mode=("points", "box", "lasso"),
+        is_selection_activated=False,
+        theme=theme,
+        use_container_width=use_container_width,
+    )
+    return st._main._enqueue("plotly_chart", proto)
+
+
+def pyplot_image(chart_id, version, build, style="default"):
+    """Show the Matplotlib figure returned by `build()`, drawn once per (data version, style)."""
+    with span(f"pyplot_image {chart_id}"):
+        png = get_figure_cache().get_png(chart_id, version, style, build)
+        return st.image(png, use_container_width=True)
@@ -0,0 +1,170 @@
+"""Holt-Winters exponential smoothing, fitted by grid search.
+
+The recursion steps through the series once for a whole grid of smoothing
+parameters: level, trend and seasonal state hold one row per (alpha, beta,
+gamma) candidate, so every candidate is scored in the same NumPy pass. The
+fits of several series and seasonal models are split across a process pool
+when the search is far larger than the dashboard's own.
+"""
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pyarrow as pa
+
+# Seasonal period of each seasonality, in days
+SEASONS = {"weekly": 7, "monthly": 30}
+MODELS = ("additive", "multiplicative")
+# Candidate values of alpha, beta and gamma
+GRID = np.round(np.arange(0.05, 1.0, 0.05), 2)
+# Grid searches scoring more candidate steps than this are split across a process pool.
+# The dashboard's fit (4 series x 4 models, ~20M steps) runs faster in-process.
+POOL_THRESHOLD = 500_000_000
+
+
+@dataclass
+class HoltWinters:
+    model: str
+    season: str
+    alpha: float
+    beta: float
+    gamma: float
+    # Mean squared one-step-ahead error, comparable across seasonal periods
+    mse: float
+    level: float
+    trend: float
+    # Seasonal components of the next `period` steps after the series ends
+    seasonals: np.ndarray
+
+    def forecast(self, horizon):
+        """Point forecasts for the `horizon` steps after the series."""
+        steps = np.arange(1, horizon + 1)
+        seasonal = self.seasonals[(steps - 1) % len(self.seasonals)]
+        if self.model == "additive":
+            return self.level + steps * self.trend + seasonal
+        return (self.level + steps * self.trend) * seasonal
+
+
+def parameter_grid(values=GRID):
+    """Every (alpha, beta, gamma) combination of `values`, as three flat arrays."""
+    alpha, beta, gamma = np.array(list(itertools.product(values, repeat=3))).T
+    return alpha, beta, gamma
+
+
+def smooth(y, alpha, beta, gamma, period, model):
+    """Run the recursion over `y` for every candidate at once.
+
+    `alpha`, `beta` and `gamma` are arrays with one entry per candidate. The
+    state is initialized from the first two seasons and the one-step-ahead
+    errors of the rest of the series are summed. Returns the SSE, level and
+    trend per candidate and the seasonal state, one row per candidate.
+    """
+    additive = model == "additive"
+    first, second = y[:period].mean(), y[period:2 * period].mean()
+    k = len(alpha)
+    level = np.full(k, first)
+    trend = np.full(k, (second - first) / period)
+    seasonals = np.tile(y[:period] - first if additive else y[:period] / first, (k, 1))
+    sse = np.zeros(k)
+
+    for t in range(period, len(y)):
+        i = t % period
+        seasonal = seasonals[:, i]
+        base = level + trend
+        error = y[t] - (base + seasonal if additive else base * seasonal)
+        sse += error * error
+        new_level = alpha * (y[t] - seasonal if additive else y[t] / seasonal) + (1 - alpha) * base
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+        seasonals[:, i] = gamma * (y[t] - level if additive else y[t] / level) + (1 - gamma) * seasonal
+
+    # A diverging candidate yields inf or nan; neither can win
+    return np.where(np.isfinite(sse), sse, np.inf), level, trend, seasonals
+
+
+def fit_grid(y, model, season, grid=GRID):
+    """The Holt-Winters fit of `y` with the lowest SSE over the parameter grid.
+
+    Returns None when the model does not apply: fewer than two seasons of
+    data, or a multiplicative model on a series that is not positive.
+    """
+    period = SEASONS[season]
+    alpha, beta, gamma = parameter_grid(grid)
+    if len(y) < 2 * period or (model == "multiplicative" and (y <= 0).any()):
+        return None
+    sse, level, trend, seasonals = smooth(y, alpha, beta, gamma, period, model)
+    best = int(np.argmin(sse))
+    return HoltWinters(
+        model=model,
+        season=season,
+        alpha=float(alpha[best]),
+        beta=float(beta[best]),
+        gamma=float(gamma[best]),
+        mse=float(sse[best] / (len(y) - period)),
+        level=float(level[best]),
+        trend=float(trend[best]),
+        # Rotate so the component of the first forecast step comes first
+        seasonals=np.roll(seasonals[best], -(len(y) % period)),
+    )
+
+
+def fit_best(series, models=MODELS, seasons=tuple(SEASONS), grid=GRID, workers=None):
+    """The best fit over every model and seasonality, for each series.
+
+    `series` maps a name to a 1-D array of daily values. Returns a dict of
+    the same names to HoltWinters fits (None where no model applies).
+    """
+    names = list(series)
+    jobs = [(name, model, season) for name in names for model in models for season in seasons]
+    args = [
+        [series[name] for name, _, _ in jobs],
+        [model for _, model, _ in jobs],
+        [season for _, _, season in jobs],
+        [grid] * len(jobs),
+    ]
+
+    candidate_steps = len(grid) ** 3 * sum(len(series[name]) for name, _, _ in jobs)
+    if candidate_steps <= POOL_THRESHOLD:
+        fits = list(map(fit_grid, *args))
+    else:
+        n_jobs = min(workers or os.cpu_count() or 1, len(jobs))
+        # Spawned workers: forking the threaded Streamlit/DuckDB process is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+            fits = list(pool.map(fit_grid, *args))
+
+    best = {name: None for name in names}
+    for (name, _, _), fit in zip(jobs, fits):
+        if fit is not None and (best[name] is None or fit.mse < best[name].mse):
+            best[name] = fit
+    return best
+
+
+def fits_to_table(fits):
+    """The fits of `fit_best` as an Arrow table, one row per series that has one."""
+    rows = [(name, fit) for name, fit in fits.items() if fit is not None]
+    return pa.table({
+        "series": [name for name, _ in rows],
+        "model": [fit.model for _, fit in rows],
+        "season": [fit.season for _, fit in rows],
+        "alpha": [fit.alpha for _, fit in rows],
+        "beta": [fit.beta for _, fit in rows],
+        "gamma": [fit.gamma for _, fit in rows],
+        "mse": [fit.mse for _, fit in rows],
+        "level": [fit.level for _, fit in rows],
+        "trend": [fit.trend for _, fit in rows],
+        "seasonals": [fit.seasonals.tolist() for _, fit in rows],
+    })
+
+
+def fits_from_table(table):
+    """Series name -> HoltWinters, from a table written by `fits_to_table`."""
+    fits = {}
+    for row in table.to_pylist():
+        name = row.pop("series")
+        row["seasonals"] = np.array(row["seasonals"])
+        fits[name] = HoltWinters(**row)
+    return fits
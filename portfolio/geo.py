@@ -0,0 +1,158 @@
+"""Server-side grid clustering of map points.
+
+Points are snapped to a square grid whose cell size follows the map zoom
+level, and their weights are summed per cell, so each zoom level renders
+at most one marker per cell however many points the dataset has. Circle
+areas are proportional to the cluster weights and the largest circle of a
+layer spans half a cell, so neighbouring clusters stay apart at every zoom.
+"""
+from dataclasses import dataclass
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+# Width of a grid cell on screen, in pixels (a Web Mercator tile is 256px)
+CELL_PIXELS = 64
+# Finer zoom levels are dropped once a layer would need more markers than this
+MAX_MARKERS = 2000
+# Metres per degree of longitude at the equator
+METRES_PER_DEGREE = 111_320
+
+
+@dataclass
+class Clusters:
+    latitude: np.ndarray
+    longitude: np.ndarray
+    weight: np.ndarray
+    count: np.ndarray
+
+
+def cell_degrees(zoom, cell_pixels=CELL_PIXELS):
+    """Grid cell size in degrees of longitude at a Web Mercator zoom level."""
+    return 360 / 2 ** zoom * cell_pixels / 256
+
+
+def grid_cluster(latitude, longitude, weight, cell):
+    """Sum `weight` over grid cells of `cell` degrees.
+
+    Each cluster sits at the weighted centroid of its points.
+    """
+    latitude = np.asarray(latitude, dtype=float)
+    longitude = np.asarray(longitude, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+
+    cells = np.stack([np.floor(latitude / cell), np.floor(longitude / cell)], axis=1)
+    _, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    count = np.bincount(inverse)
+    total = np.bincount(inverse, weights=weight)
+    # Weighted centroids, falling back to plain centroids where a cell's weight is zero
+    has_weight = total > 0
+    divisor = np.where(has_weight, total, 1)
+
+    def centroid(values):
+        weighted = np.bincount(inverse, weights=values * weight) / divisor
+        return np.where(has_weight, weighted, np.bincount(inverse, weights=values) / count)
+
+    return Clusters(
+        latitude=centroid(latitude),
+        longitude=centroid(longitude),
+        weight=total,
+        count=count,
+    )
+
+
+def cluster_radii(clusters, cell):
+    """Circle radius of each cluster in metres, on a grid of `cell` degrees.
+
+    Radii grow with the square root of the weight, so circle areas compare
+    like the weights, and the heaviest cluster gets half a cell (narrowed by
+    its latitude, as a degree of longitude shrinks away from the equator).
+    """
+    largest = clusters.weight.max() if len(clusters.weight) else 0
+    if largest <= 0:
+        return np.zeros(len(clusters.weight))
+    half_cell = cell / 2 * METRES_PER_DEGREE * np.cos(np.radians(clusters.latitude))
+    return half_cell * np.sqrt(np.clip(clusters.weight, 0, None) / largest)
+
+
+def clusters_geojson(clusters, cell):
+    """FeatureCollection of clusters, one point per cell with its radius in properties.style."""
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, 4), round(lat, 4)]},
+            "properties": {
+                "tooltip": f"{count} locations: {weight:,.0f} cases",
+                "style": {"radius": round(radius)},
+            },
+        }
+        for lat, lon, weight, count, radius in zip(
+            clusters.latitude.tolist(),
+            clusters.longitude.tolist(),
+            clusters.weight.tolist(),
+            clusters.count.tolist(),
+            cluster_radii(clusters, cell).tolist(),
+        )
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+class ZoomLayers(MacroElement):
+    """Show exactly one of the given layers, chosen by the map's current zoom."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var layers = {
+                {%- for zoom, layer in this.layers %}
+                {{ zoom }}: {{ layer.get_name() }},
+                {%- endfor %}
+            };
+            function update() {
+                var zoom = Math.min(Math.max(map.getZoom(), {{ this.min_zoom }}), {{ this.max_zoom }});
+                for (var key in layers) {
+                    if (Number(key) === zoom) {
+                        map.addLayer(layers[key]);
+                    } else {
+                        map.removeLayer(layers[key]);
+                    }
+                }
+            }
+            map.on("zoomend", update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, layers):
+        super().__init__()
+        self._name = "ZoomLayers"
+        self.layers = sorted(layers.items())
+        self.min_zoom = self.layers[0][0]
+        self.max_zoom = self.layers[-1][0]
+
+
+def add_clustered_circles(m, latitude, longitude, weight, zooms, max_markers=MAX_MARKERS, **circle_options):
+    """Add one clustered circle layer per zoom level to `m`.
+
+    Zoom levels whose grid would hold more than `max_markers` clusters are
+    skipped; deeper zooms keep showing the finest layer that fits.
+    """
+    layers = {}
+    for zoom in zooms:
+        cell = cell_degrees(zoom)
+        clusters = grid_cluster(latitude, longitude, weight, cell)
+        if layers and len(clusters.weight) > max_markers:
+            break
+        layers[zoom] = folium.GeoJson(
+            clusters_geojson(clusters, cell),
+            marker=folium.Circle(**circle_options),
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+        ).add_to(m)
+    ZoomLayers(layers).add_to(m)
+    return m
@@ -0,0 +1,128 @@
+"""Deferred imports of the heavy plotting and mapping libraries.
+
+`lazy_import("plotly.express")` returns a stand-in that imports the real
+module on first attribute access, so a page only pays for a library when a
+section that uses it actually renders (and not at all when its charts come
+from a cache). The time each first import took is kept for the debug panel.
+
+    python -m portfolio.lazy [views.project_1 ...]
+
+runs each page in a fresh interpreter under `python -X importtime` and
+reports the import time spent while the page itself ran, per package.
+"""
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+_lock = threading.Lock()
+_import_times = {}
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            name = self.__dict__["_name"]
+            already_loaded = name in sys.modules
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            if not already_loaded:
+                with _lock:
+                    _import_times.setdefault(name, time.perf_counter() - start)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module `name`, imported on first use."""
+    return LazyModule(name)
+
+
+def import_times():
+    """Seconds taken by each lazily imported module, in import order."""
+    with _lock:
+        return [{"module": name, "seconds": seconds} for name, seconds in _import_times.items()]
+
+
+# --- PER-PAGE IMPORT REPORT ---
+# Imports before the marker belong to Streamlit and the test harness; running
+# a light page first loads the runtime modules every page shares.
+PAGE_MARKER = "--- page start ---"
+RUNNER = f"""
+import sys
+from streamlit.testing.v1 import AppTest
+from portfolio.build import page_script
+
+AppTest.from_string(page_script("views.about_me")).run()
+sys.stderr.write("{PAGE_MARKER}\\n")
+sys.stderr.flush()
+at = AppTest.from_string(page_script(sys.argv[1]), default_timeout=600)
+at.run()
+sys.exit(1 if at.exception else 0)
+"""
+
+
+def parse_importtime(stderr):
+    """Self time in seconds per top-level package, for imports after the page marker."""
+    lines = stderr.splitlines()
+    if PAGE_MARKER in lines:
+        lines = lines[lines.index(PAGE_MARKER) + 1:]
+    packages = defaultdict(float)
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header row
+        packages[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+
+def page_import_report(page):
+    """Run `page` in a fresh interpreter and return its import time per package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, page],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    # Imported here: the build module pulls in the figure cache, which uses this module
+    from portfolio.build import PAGES
+
+    argv = sys.argv[1:] if argv is None else argv
+    as_json = "--json" in argv
+    pages = [arg for arg in argv if arg != "--json"] or PAGES
+
+    report = {page: page_import_report(page) for page in pages}
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for page, packages in report.items():
+        print(f"{page}: {sum(packages.values()):.3f}s in imports")
+        for package, seconds in list(packages.items())[:10]:
+            print(f"  {package:<24}{seconds:8.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
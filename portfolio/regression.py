@@ -0,0 +1,140 @@
+"""Ordinary least squares fitted in streaming chunks, with bootstrap intervals.
+
+XᵀX and Xᵀy are accumulated chunk by chunk, so memory stays constant however
+large the source file is, and the small normal system is solved at the end.
+The bootstrap is a Poisson bootstrap: each row gets an independent Poisson(1)
+weight per resample instead of being drawn with replacement, so it can be
+accumulated over the file the same way, one XᵀWX per resample.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Resample counts above this are split across a process pool
+POOL_THRESHOLD = 20_000
+# Resample x row weights drawn at once; each weight costs two 8-byte values of scratch memory
+BOOTSTRAP_CELLS = 2_000_000
+
+
+@dataclass
+class Regression:
+    intercept: float
+    coefficients: pd.Series
+    metrics: dict
+    n_rows: int
+
+
+def design_matrix(chunk, features):
+    """Feature matrix with a leading column of ones for the intercept."""
+    X = np.ones((len(chunk), len(features) + 1))
+    X[:, 1:] = chunk[features].to_numpy(dtype=float)
+    return X
+
+
+def read_chunks(path, features, target, chunksize):
+    return pd.read_csv(path, usecols=features + [target], chunksize=chunksize)
+
+
+def fit_streaming(path, features, target, chunksize=100_000):
+    """Fit `target ~ features` over the CSV at `path` in chunks of `chunksize` rows.
+
+    The metrics (MAE, RMSE, MAPE, R2) are computed in a second streaming pass
+    over the same rows the model was fitted on.
+    """
+    k = len(features) + 1
+    xtx = np.zeros((k, k))
+    xty = np.zeros(k)
+    n = 0
+    sum_y = 0.0
+    sum_yy = 0.0
+    for chunk in read_chunks(path, features, target, chunksize):
+        X = design_matrix(chunk, features)
+        y = chunk[target].to_numpy(dtype=float)
+        xtx += X.T @ X
+        xty += X.T @ y
+        n += len(y)
+        sum_y += y.sum()
+        sum_yy += y @ y
+
+    beta = np.linalg.solve(xtx, xty)
+
+    abs_err = 0.0
+    sq_err = 0.0
+    abs_pct_err = 0.0
+    for chunk in read_chunks(path, features, target, chunksize):
+        y = chunk[target].to_numpy(dtype=float)
+        residual = y - design_matrix(chunk, features) @ beta
+        abs_err += np.abs(residual).sum()
+        sq_err += residual @ residual
+        abs_pct_err += np.abs(residual / y).sum()
+
+    ss_tot = sum_yy - sum_y ** 2 / n
+    metrics = {
+        "MAE": abs_err / n,
+        "RMSE": np.sqrt(sq_err / n),
+        "MAPE": abs_pct_err / n,
+        "R2": 1 - sq_err / ss_tot,
+    }
+    return Regression(
+        intercept=beta[0],
+        coefficients=pd.Series(beta[1:], index=features),
+        metrics=metrics,
+        n_rows=n,
+    )
+
+
+def _in_pool(batch, args, n_resamples, seed, workers):
+    """Call `batch(*args, size, seed)` on a process pool, splitting the resamples across workers."""
+    n_jobs = workers or os.cpu_count() or 1
+    # Spawned workers: forking the threaded Streamlit/DuckDB process is unsafe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+        sizes = [len(part) for part in np.array_split(np.arange(n_resamples), n_jobs)]
+        seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+        columns = [[arg] * n_jobs for arg in args]
+        parts = pool.map(batch, *columns, sizes, seeds)
+        return np.concatenate(list(parts))
+
+
+def _bootstrap_file_batch(path, features, target, n_resamples, seed):
+    """Poisson bootstrap coefficients of `target ~ features`, streamed over the CSV at `path`.
+
+    Every row gets an independent Poisson(1) weight in each resample, so the
+    weighted normal equations can be accumulated chunk by chunk. Chunks are
+    sized so the weight matrix stays within BOOTSTRAP_CELLS.
+    """
+    rng = np.random.default_rng(seed)
+    k = len(features) + 1
+    xtx = np.zeros((n_resamples, k, k))
+    xty = np.zeros((n_resamples, k))
+    chunksize = max(1, BOOTSTRAP_CELLS // n_resamples)
+    for chunk in read_chunks(path, features, target, chunksize):
+        X = design_matrix(chunk, features)
+        y = chunk[target].to_numpy(dtype=float)
+        weights = rng.poisson(1.0, size=(n_resamples, len(y))).astype(float)
+        xtx += np.einsum("bn,ni,nj->bij", weights, X, X, optimize=True)
+        xty += weights @ (X * y[:, None])
+    return np.linalg.solve(xtx, xty[..., None])[..., 0]
+
+
+def bootstrap_file(path, features, target, n_resamples=1000, seed=0, workers=None):
+    """Bootstrap distribution of the OLS coefficients over the CSV at `path`, one row per resample.
+
+    The file is read in chunks and never held in memory as a whole. Large
+    resample counts are split across a process pool with independent random
+    streams.
+    """
+    if n_resamples <= POOL_THRESHOLD:
+        return _bootstrap_file_batch(path, features, target, n_resamples, seed)
+    return _in_pool(_bootstrap_file_batch, [path, features, target], n_resamples, seed, workers)
+
+
+def confidence_intervals(betas, names, level=0.95):
+    """Percentile intervals from a bootstrap distribution, indexed by `names`."""
+    tail = (1 - level) / 2 * 100
+    lower, upper = np.percentile(betas, [tail, 100 - tail], axis=0)
+    return pd.DataFrame({"lower": lower, "upper": upper}, index=names)
@@ -0,0 +1,95 @@
+"""Timing spans for the sections of a page rerun.
+
+    with span("covid.map") as s:
+        html = build_map(locations)
+        s.rows = len(locations)
+
+`span` also works as a decorator, `@span("customers.pairplot")`. Every span
+records its duration, nesting depth and the rows it processed into the
+current rerun of the session; `app.py` starts a rerun record before each
+page run and shows the breakdown in the ?debug sidebar. The last reruns of
+a session can be exported as JSON lines.
+"""
+import json
+import time
+from contextlib import ContextDecorator
+
+import streamlit as st
+
+SESSION_KEY = "_spans"
+# Reruns kept per session for the export
+HISTORY = 50
+
+
+def _reruns():
+    reruns = st.session_state.get(SESSION_KEY)
+    if reruns is None:
+        reruns = st.session_state[SESSION_KEY] = []
+    return reruns
+
+
+def begin_rerun(page):
+    """Start a new rerun record for `page` in the current session."""
+    reruns = _reruns()
+    reruns.append({"page": page, "started": time.time(), "clock": time.perf_counter(), "depth": 0, "spans": []})
+    del reruns[:-HISTORY]
+
+
+def current_rerun():
+    """The rerun record spans are being added to, starting one if needed."""
+    reruns = _reruns()
+    if not reruns:
+        begin_rerun(None)
+    return reruns[-1]
+
+
+class span(ContextDecorator):
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def _recreate_cm(self):
+        # A fresh span per decorated call, so calls never share timing state
+        return span(self.name, self.rows)
+
+    def __enter__(self):
+        self._rerun = current_rerun()
+        self._depth = self._rerun["depth"]
+        self._rerun["depth"] += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        self._rerun["depth"] = self._depth
+        self._rerun["spans"].append({
+            "name": self.name,
+            "depth": self._depth,
+            "offset": self._start - self._rerun["clock"],
+            "seconds": seconds,
+            "rows": None if self.rows is None else int(self.rows),
+        })
+        return False
+
+
+def breakdown(rerun=None):
+    """Spans of `rerun` (default: the latest) in start order, names indented by depth."""
+    rerun = rerun or current_rerun()
+    return [
+        {
+            "section": "· " * s["depth"] + s["name"],
+            "ms": round(s["seconds"] * 1000, 1),
+            "rows": s["rows"],
+        }
+        for s in sorted(rerun["spans"], key=lambda s: s["offset"])
+    ]
+
+
+def to_jsonl():
+    """Every span of the session's recent reruns as JSON lines, one span per line."""
+    lines = []
+    for rerun in _reruns():
+        for s in rerun["spans"]:
+            record = {"page": rerun["page"], "rerun_started": rerun["started"], **s}
+            lines.append(json.dumps(record))
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,129 @@
+"""Columnar sidecar cache for slow-to-parse source files.
+
+The first load of a source (e.g. an Excel workbook) converts it into an Arrow
+IPC file next to the other cached artifacts. Later process starts memory-map
+that sidecar instead of parsing the source again.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from portfolio.dtypes import apply_plan
+from portfolio.spans import span
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path("./assets/.cache")
+
+_lock = threading.Lock()
+_load_reports = []
+# (path, size, mtime) -> content hash, so unchanged files are not hashed on every rerun
+_versions = {}
+
+
+@dataclass
+class LoadReport:
+    source: str
+    path: str  # "sidecar" or "source"
+    seconds: float
+
+
+def file_version(source):
+    """Short key that changes whenever the contents of the source file change.
+
+    The key depends only on the bytes of the file, so artifacts built in
+    another checkout or by CI match the served files. The contents are
+    hashed again only when the file's path, size or mtime changes.
+    """
+    stat = os.stat(source)
+    signature = (os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        version = _versions.get(signature)
+    if version is None:
+        digest = hashlib.sha1()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        version = digest.hexdigest()[:16]
+        with _lock:
+            _versions[signature] = version
+    return version
+
+
+def load_reports():
+    """Every load through `load_columnar` in this process, oldest first, for the debug panel."""
+    with _lock:
+        return [asdict(report) for report in _load_reports]
+
+
+def sidecar_path(source, version=None):
+    version = version or file_version(source)
+    return CACHE_DIR / f"{Path(source).name}.{version}.arrow"
+
+
+def write_ipc(table, path):
+    """Write `table` as an Arrow IPC file, atomically replacing `path`."""
+    # Write to a temporary file first so a concurrent reader never sees a partial file
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _remove_stale(source, keep):
+    for old in CACHE_DIR.glob(f"{Path(source).name}.*.arrow"):
+        if old != keep:
+            old.unlink(missing_ok=True)
+
+
+def read_ipc(path):
+    """Memory-map an Arrow IPC file; the returned table does not copy the data."""
+    return ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def load_columnar(source, reader, plan=None):
+    """Load `source` through its Arrow sidecar, creating it with `reader` if needed.
+
+    `reader` takes the source path and returns a pandas DataFrame or Arrow table.
+    With a dtype `plan` (see portfolio.dtypes) the sidecar is stored in the
+    planned types. Returns the Arrow table and a LoadReport with the time taken.
+    """
+    start = time.perf_counter()
+    version = file_version(source)
+    if plan:
+        # A changed plan writes a new sidecar instead of reusing one in the old types
+        version += "-" + hashlib.sha1(json.dumps(plan, sort_keys=True).encode()).hexdigest()[:8]
+    path = sidecar_path(source, version)
+
+    with span(f"load {Path(source).name}") as load:
+        if path.exists():
+            table = read_ipc(path)
+            report = LoadReport(str(source), "sidecar", time.perf_counter() - start)
+        else:
+            data = reader(source)
+            if plan:
+                data = apply_plan(data, plan)
+            elif not isinstance(data, pa.Table):
+                data = pa.Table.from_pandas(data, preserve_index=False)
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_ipc(data, path)
+            _remove_stale(source, keep=path)
+            table = read_ipc(path)
+            report = LoadReport(str(source), "source", time.perf_counter() - start)
+        load.rows = table.num_rows
+        # The span shows which path the load took
+        load.name = f"load {Path(source).name} ({report.path})"
+
+    with _lock:
+        _load_reports.append(report)
+    logger.info("Loaded %s from %s in %.3fs", report.source, report.path, report.seconds)
+    return table, report
@@ -0,0 +1 @@
+"""Portfolio pages, each exposing `render()` for `st.Page`."""
@@ -1,32 +1,333 @@
+"""Black Pearl Coffee Shop sales page.
+
+`compute` runs every query the page needs once per data version and filter
+selection; `render` only lays out the text and the cached charts, so a rerun
+does no data work.
+"""
 import streamlit as st
 
 # Data manipulation
-import pandas as pd
 import numpy as np
+import pandas as pd
 
-# Data viz
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-
-# SQL query
-import duckdb as db
-
-# SQL function
-def sql(sql_query):
-    return db.sql(sql_query).to_df()
+# Data viz, imported when a chart is first built instead of on every page load
+from portfolio.lazy import lazy_import
+
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
+# SQL query on the shared DuckDB connection
+from portfolio.db import get_database, scratch_connection
+
+# Figure specs cached per data version
+from portfolio.figures import plotly_chart
+
+# Cached dataset loading
+from portfolio.black_pearl import (
+    ALL_LOCATIONS,
+    DAYS_ORDER,
+    HOURS,
+    SalesFilter,
+    filter_options,
+    filtered_cube,
+    filtered_weekday_hour_grid,
+    get_aggregate_cache,
+    normalize_filter,
+    register_forecast,
+    register_sales,
+    sales_forecast,
+    weekday_hour_grid,
+)
+from portfolio.explorer import data_explorer
+from portfolio.spans import span
 
-st.title("Black Pearl Coffee Shop Sales", anchor=False)
 
-url = 'https://github.com/afrisiringo/Black-Pearl-Coffee-Shop-Sales-Analysis'
+# --- DATA ---
+def compute(sales_version, filters=SalesFilter()):
+    """Aggregates behind the charts, for the sales registered at `sales_version`.
 
-st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
+    Results are kept per (version, filters) in the shared LRU cache, together
+    with the chart specs drawn from them. The heatmap grid is summed from the
+    per-location grids when only store locations are filtered.
+    """
+    return get_aggregate_cache().get(
+        (sales_version, filters),
+        lambda: chart_data(filtered_cube(filters), filtered_weekday_hour_grid(sales_version, filters)),
+    )
 
-st.markdown("---")
 
-# --- BACKGROUND ---
+@span("project_1.compute")
+def chart_data(cube, hourly_rev=None):
+    """Every chart's frame, queried from the aggregate `cube`.
 
-st.markdown("""
+    `hourly_rev`, when given, is the 7 x 24 heatmap grid, and the cube's
+    weekday/hour rows are not read.
+    """
+    with scratch_connection(sales_cube=cube) as con:
+        best_selling = con.sql(
+            """
+            SELECT 
+                product_detail,
+                total_qty as total_sold
+            FROM sales_cube
+            WHERE grouping_set = 'product_detail'
+            ORDER BY total_qty DESC
+            LIMIT 10
+            """
+        ).fetchnumpy()
+
+        top_earner = con.sql(
+            """
+            SELECT 
+                product_detail,
+                total_revenue
+            FROM sales_cube
+            WHERE grouping_set = 'product_detail'
+            ORDER BY total_revenue DESC
+            LIMIT 10
+            """
+        ).fetchnumpy()
+
+        sales_by_category = con.sql(
+            """
+            SELECT 
+                product_category,
+                total_revenue AS total_sales
+            FROM sales_cube
+            WHERE grouping_set = 'product_category'
+            ORDER BY total_revenue DESC
+            """
+        ).fetchnumpy()
+
+        sales_by_locations = con.sql(
+            """
+            SELECT
+                store_location,
+                total_revenue AS total_sales
+            FROM sales_cube
+            WHERE grouping_set = 'store_location'
+            ORDER BY total_revenue DESC
+            """
+        ).fetchnumpy()
+
+        if hourly_rev is None:
+            weekday_hour = con.sql(
+                """
+                SELECT 
+                    list_position(?, day_of_week::VARCHAR) AS weekday,
+                    transaction_hour,
+                    total_revenue AS total_sales
+                FROM sales_cube
+                WHERE grouping_set = 'weekday_hour'
+                """,
+                params=[DAYS_ORDER],
+            ).fetchnumpy()
+            # Fixed 7 x 24 grid, Monday first, filled by position instead of a pivot
+            hourly_rev = weekday_hour_grid(
+                weekday_hour["weekday"], weekday_hour["transaction_hour"], weekday_hour["total_sales"]
+            )
+
+        sales_trend = con.sql(
+            """
+            SELECT 
+                transaction_date,
+                total_revenue as sales
+            FROM sales_cube
+            WHERE grouping_set = 'transaction_date'
+            ORDER BY transaction_date ASC
+            """
+        ).df()
+
+    # Daily time series, with missing days as gaps
+    sales_trend = sales_trend.set_index('transaction_date').asfreq('D')
+
+    return {
+        "best_selling": best_selling,
+        "top_earner": top_earner,
+        "sales_by_category": sales_by_category,
+        "sales_by_locations": sales_by_locations,
+        "hourly_rev": hourly_rev,
+        "sales_trend": sales_trend,
+        # Plotly specs drawn from this data, filled in by render()
+        "specs": {},
+    }
+
+
+def sidebar_filters(sales_version):
+    """Filter widgets in the sidebar, returned as a normalized SalesFilter."""
+    options = filter_options(sales_version)
+    st.sidebar.markdown("### Filters")
+    dates = st.sidebar.date_input(
+        "Transaction dates",
+        value=(options["first"], options["last"]),
+        min_value=options["first"],
+        max_value=options["last"],
+        key="sales_dates",
+    )
+    locations = st.sidebar.multiselect("Store locations", options["locations"], key="sales_locations")
+    categories = st.sidebar.multiselect("Product categories", options["categories"], key="sales_categories")
+    # The range holds a single date while its end is being picked
+    start = dates[0] if len(dates) > 0 else None
+    end = dates[1] if len(dates) > 1 else None
+    return normalize_filter(options, start, end, locations, categories)
+
+
+# --- CHARTS ---
+def best_selling_chart(best_selling):
+    # Data viz with horizontal bar chart
+    fig = px.bar(
+        best_selling, 
+        x="total_sold", 
+        y="product_detail", 
+        orientation='h',
+        color="product_detail",
+        hover_name="product_detail"
+    )
+
+    # Custom layout
+    fig.update_layout(
+        width=1200,
+        xaxis_title="Total Units Sold",
+        yaxis_title="",
+        showlegend=False
+    )
+    return fig
+
+
+def top_earner_chart(top_earner):
+    # Data viz with horizontal bar chart
+    fig = px.bar(
+        top_earner, 
+        x="total_revenue", 
+        y="product_detail", 
+        orientation='h',
+        color="product_detail",
+        hover_name="product_detail"
+    )
+
+    # Custom layout
+    fig.update_layout(
+        width=1200,
+        xaxis_title="Total Sales ($)",
+        yaxis_title="",
+        xaxis=dict(tickformat=","),
+        showlegend=False
+    )
+    return fig
+
+
+def sales_by_category_chart(sales_by_category):
+    # Data viz with horizontal bar chart
+    fig = px.bar(
+        sales_by_category, 
+        x="total_sales", 
+        y="product_category", 
+        orientation='h',
+        color="product_category",
+        hover_name="product_category"
+    )
+
+    # Custome layout
+    fig.update_layout(
+        width=1200,
+        xaxis_title="Total Sales ($)",
+        yaxis_title="",
+        xaxis=dict(tickformat=","),
+        showlegend=False
+    )
+    return fig
+
+
+def sales_by_locations_chart(sales_by_locations):
+    # Data viz with horizontal bar chart
+    fig = px.bar(
+        sales_by_locations, 
+        x="store_location", 
+        y="total_sales", 
+        color="store_location",
+        hover_name="store_location"
+    )
+
+    # Custome layout
+    fig.update_layout(
+        width=1200,
+        xaxis_title="Total Sales ($)",
+        yaxis_title="",
+        xaxis=dict(tickformat=","),
+        showlegend=False
+    )
+    return fig
+
+
+def hourly_rev_chart(grid):
+    # Only the hours from the first to the last with any sales
+    open_hours = np.flatnonzero(grid.any(axis=0))
+    hours = np.arange(open_hours[0], open_hours[-1] + 1) if len(open_hours) else np.arange(HOURS)
+
+    # Membuat heatmap dengan Plotly
+    fig = px.imshow(grid[:, hours],
+                    x=hours,
+                    y=DAYS_ORDER,
+                    text_auto=True, 
+                    labels=dict(x="Hour of The Day", y="", color="Total Sales"), 
+                    color_continuous_scale='YlGnBu',
+                    width=1200)
+
+    # Menonaktifkan color bar
+    fig.update_layout(
+        coloraxis_showscale=False
+    )
+    return fig
+
+
+def sales_trend_chart(sales_trend):
+    # Data viz of sales trend
+    fig = px.line(sales_trend, x=sales_trend.index, y="sales")
+    fig.update_layout(
+        width=1200,
+        height=500,
+        xaxis_title='',
+        yaxis_title='Sales ($)'
+    )
+    return fig
+
+
+def sales_projection_chart(original_sales, forecast_sales):
+    # Membuat line graph
+    fig = go.Figure()
+
+    # Menambahkan line untuk original sales
+    fig.add_trace(go.Scatter(x=original_sales.index, y=original_sales, 
+                             mode='lines', name='Original Sales', 
+                             line=dict(color='blue')))
+
+    # Menambahkan line untuk forecast sales
+    fig.add_trace(go.Scatter(x=forecast_sales.index, y=forecast_sales, 
+                             mode='lines', name='Forecast Sales', 
+                             line=dict(color='red')))
+
+    # Update layout
+    fig.update_layout(
+         xaxis_title="",
+        yaxis_title="Sales ($)",
+    )
+    return fig
+
+
+# --- PAGE ---
+
+def render():
+    st.title("Black Pearl Coffee Shop Sales", anchor=False)
+
+    url = 'https://github.com/afrisiringo/Black-Pearl-Coffee-Shop-Sales-Analysis'
+
+    st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    # --- BACKGROUND ---
+
+    st.markdown("""
 ### Background
 <p style='text-align: justify; padding: 1px;'>
 Black Pearl is a newly opened coffee shop with a pirate theme that operates in three locations: X, Y, and Z. 
@@ -38,9 +339,9 @@ with the goal of supporting business growth and development.
 
 
 
-# --- OBJECTIVE
+    # --- OBJECTIVE
 
-st.markdown("""
+    st.markdown("""
 ### Objective
 <p style='text-align: justify; padding: 1px;'>
 To derive insights that can help Black Pearl coffee shop optimize sales and improve product offerings.
@@ -49,9 +350,9 @@ To derive insights that can help Black Pearl coffee shop optimize sales and impr
 
 
 
-# --- PROBLEM STATEMENT ---
+    # --- PROBLEM STATEMENT ---
 
-st.markdown("""
+    st.markdown("""
 ### Problem Statement
 <ul style='text-align: justify; padding: 10px;'>
 <li>What are the best-selling products and categories?</li>
@@ -62,40 +363,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# --- DATASET ---
-@st.cache_data
-def load_data():
-    return pd.read_excel('./assets/Black_Pearl_Sales.xlsx')
+    # --- DATASET ---
+    # The workbook is converted once into an Arrow sidecar keyed by its version, and the
+    # derived columns (revenue, transaction_hour, day_of_week) are built once per version.
+    # New daily exports are appended incrementally, then the transaction table and its
+    # aggregate cube are registered once per data version
+    sales_version = register_sales(get_database())
 
-sales = load_data()
+    # Filters are pushed down into DuckDB and their aggregates kept in a bounded LRU.
+    # Unfiltered charts come from the shared figure cache (and the build artifacts);
+    # filtered ones keep their specs next to their cached data.
+    filters = sidebar_filters(sales_version)
+    data = compute(sales_version, filters)
+    specs = None if filters == SalesFilter() else data["specs"]
 
-st.markdown("""
+    st.markdown("""
 ### Dataset
 <p style='text-align: justify; padding: 1px;'>
 The data used is sales data for 6 months from a coffee shop that just started operating in early January 2023. 
 </p>
 """, unsafe_allow_html=True)
 
-# Menampilkan DataFrame di Streamlit
-st.dataframe(sales)
+    # Browse the transactions one page at a time, sorted and filtered in DuckDB
+    data_explorer("sales", key="sales", unique_key="transaction_id")
 
+    if specs is not None:
+        st.info("The charts below show the filtered transactions; the figures quoted in the text are for all of them.")
 
 
-# --- DATA PREPARATION ---
 
-sales['transaction_time'] = pd.to_datetime(sales['transaction_time'], format='%H:%M:%S')
-
-# Revenue
-sales["revenue"] = sales["transaction_qty"] * sales["unit_price"]
-
-# The hour of the transactions
-sales["transaction_hour"] = sales["transaction_time"].dt.hour
-
-# Name of the day
-sales["day_of_week"] = sales["transaction_date"].dt.day_name()
-
-# --- Top 10 Best Selling Items ---
-st.markdown("""
+    # --- Top 10 Best Selling Items ---
+    st.markdown("""
 ### Top 10 Best Selling Items
 <p style='text-align: justify; padding: 1px;'>
 The best-selling item is Earl Grey Rg, with a total of 4,708 units sold, making it the most popular choice among buyers. 
@@ -103,44 +401,15 @@ Note that the differences in the number of units sold for each product are not s
 </p>
 """, unsafe_allow_html=True)
 
-best_selling = sql(
-    """
-    SELECT 
-        product_detail,
-        SUM(transaction_qty) as total_sold
-    FROM sales
-    GROUP BY product_detail
-    ORDER BY SUM(transaction_qty) DESC
-    LIMIT 10
-    """
-)
-
-# Data viz with horizontal bar chart
-fig = px.bar(
-    best_selling, 
-    x="total_sold", 
-    y="product_detail", 
-    orientation='h',
-    color="product_detail",
-    hover_name="product_detail"
-)
-
-# Custom layout
-fig.update_layout(
-    width=1200,
-    xaxis_title="Total Units Sold",
-    yaxis_title="",
-    showlegend=False
-)
 
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
+    # Menampilkan grafik di Streamlit
+    plotly_chart("best_selling", sales_version, lambda: best_selling_chart(data["best_selling"]), use_container_width=True, specs=specs)
 
 
 
-# --- 10 Top Earner Items ---
+    # --- 10 Top Earner Items ---
 
-st.markdown("""
+    st.markdown("""
 ### Top Earner Items
 <p style='text-align: justify; padding: 1px;'>
 Interestingly, although Earl Grey Rg is the best-selling item, it is not the item that generates the most revenue. The top earner is Davy Jones Hot Chocolate Lg, generating total sales 
@@ -148,46 +417,15 @@ of $21,151.75 , making it the highest revenue-generating item based on sales, fo
 </p>
 """, unsafe_allow_html=True)
 
-# Query
-top_earner = sql(
-    """
-    SELECT 
-        product_detail,
-        SUM(revenue) as total_revenue
-    FROM sales
-    GROUP BY product_detail
-    ORDER BY SUM(revenue) DESC
-    LIMIT 10
-    """
-)
 
-# Data viz with horizontal bar chart
-fig = px.bar(
-    top_earner, 
-    x="total_revenue", 
-    y="product_detail", 
-    orientation='h',
-    color="product_detail",
-    hover_name="product_detail"
-)
+    # Menampilkan grafik di Streamlit
+    plotly_chart("top_earner", sales_version, lambda: top_earner_chart(data["top_earner"]), use_container_width=True, specs=specs)
 
-# Custom layout
-fig.update_layout(
-    width=1200,
-    xaxis_title="Total Sales ($)",
-    yaxis_title="",
-    xaxis=dict(tickformat=","),
-    showlegend=False
-)
-
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
 
 
+    # --- Total Sales by Product Category ---
 
-# --- Total Sales by Product Category ---
-
-st.markdown("""
+    st.markdown("""
 ### Total Sales by Product Category
 <p style='text-align: justify; padding: 1px;'>
 The coffee product category generated a revenue of $269,952.45, making it the top earner. This figure makes sense, as the shop primarily focuses on coffee. The sales reflect the demand for 
@@ -195,44 +433,14 @@ coffee among customers, aligning with the shop's core offerings.
 </p>
 """, unsafe_allow_html=True)
 
-# Query
-sales_by_category = sql(
-    """
-    SELECT 
-        product_category,
-        SUM(revenue) AS total_sales
-    FROM sales
-    GROUP BY product_category
-    ORDER BY SUM(revenue) DESC
-    """
-)
-
-# Data viz with horizontal bar chart
-fig = px.bar(
-    sales_by_category, 
-    x="total_sales", 
-    y="product_category", 
-    orientation='h',
-    color="product_category",
-    hover_name="product_category"
-)
-
-# Custome layout
-fig.update_layout(
-    width=1200,
-    xaxis_title="Total Sales ($)",
-    yaxis_title="",
-    xaxis=dict(tickformat=","),
-    showlegend=False
-)
 
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
+    # Menampilkan grafik di Streamlit
+    plotly_chart("sales_by_category", sales_version, lambda: sales_by_category_chart(data["sales_by_category"]), use_container_width=True, specs=specs)
 
 
-# --- Total Sales By Locations ---
+    # --- Total Sales By Locations ---
 
-st.markdown("""
+    st.markdown("""
 ### Total Sales by Store Locations
 <p style='text-align: justify; padding: 1px;'>
 The Coffee Shop in location Y has generated the highest revenue. However, it's important to note that the financial performance across all three locations is quite similar, as the differences in total sales 
@@ -240,87 +448,22 @@ among them are not significant.
 </p>
 """, unsafe_allow_html=True)
 
-sales_by_locations = sql(
-    """
-    SELECT
-        store_location,
-        SUM(revenue) AS total_sales
-    FROM sales
-    GROUP BY store_location
-    ORDER BY SUM(revenue) DESC
-    """
-)
 
-# Data viz with horizontal bar chart
-fig = px.bar(
-    sales_by_locations, 
-    x="store_location", 
-    y="total_sales", 
-    color="store_location",
-    hover_name="store_location"
-)
+    # Menampilkan grafik di Streamlit
+    plotly_chart("sales_by_locations", sales_version, lambda: sales_by_locations_chart(data["sales_by_locations"]), use_container_width=True, specs=specs)
 
-# Custome layout
-fig.update_layout(
-    width=1200,
-    xaxis_title="Total Sales ($)",
-    yaxis_title="",
-    xaxis=dict(tickformat=","),
-    showlegend=False
-)
 
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
+    # --- Distribution of Total Sales Per Hour: Peak Sales Times ---
 
-
-# --- Distribution of Total Sales Per Hour: Peak Sales Times ---
-
-st.markdown("""
+    st.markdown("""
 ### Distribution of Total Sales Per Hour: Peak Sales Times
 """, unsafe_allow_html=True)
 
-# Query
-hourly_rev = sql(
-    """
-    SELECT 
-        DAYOFWEEK(transaction_date) AS day,
-        day_of_week,
-        transaction_hour,
-        SUM(revenue) AS total_sales
-    FROM sales
-    GROUP BY 
-        DAYOFWEEK(transaction_date),
-        day_of_week,
-        transaction_hour
-    ORDER BY 
-        DAYOFWEEK(transaction_date),
-        transaction_hour
-    """
-)
-
-pivot_df = hourly_rev.pivot(index="day_of_week", columns="transaction_hour", values="total_sales")
-
-days_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
-# Sort the names of the days
-pivot_df = pivot_df.reindex(days_order)
+    # Menampilkan grafik di Streamlit
+    plotly_chart("hourly_rev", sales_version, lambda: hourly_rev_chart(data["hourly_rev"]), use_container_width=True, specs=specs)
 
-# Membuat heatmap dengan Plotly
-fig = px.imshow(pivot_df, 
-                text_auto=True, 
-                labels=dict(x="Hour of The Day", y="", color="Total Sales"), 
-                color_continuous_scale='YlGnBu',
-                width=1200)
-
-# Menonaktifkan color bar
-fig.update_layout(
-    coloraxis_showscale=False
-)
-
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
-
-st.markdown("""
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 From the heatmap we can see a few key insights:
 </p> 
@@ -336,43 +479,17 @@ there aren't enough sales to cover them. Additionally, adjusting the hours could
 """, unsafe_allow_html=True)
 
 
-# --- Sales Trend ---
+    # --- Sales Trend ---
 
-st.markdown("""
+    st.markdown("""
 ### Sales Trend
 """, unsafe_allow_html=True)
 
-# Query
-sales_trend = sql(
-    """
-    SELECT 
-        transaction_date,
-        SUM(revenue) as sales
-    FROM sales
-    GROUP BY transaction_date
-    ORDER BY transaction_date ASC
-    """
-)
-
-# Make a time series data frame
-sales_trend = sales_trend.set_index('transaction_date')
 
-# Set the frequency to daily
-sales_trend = sales_trend.asfreq('D')
+    # Menampilkan grafik di Streamlit
+    plotly_chart("sales_trend", sales_version, lambda: sales_trend_chart(data["sales_trend"]), use_container_width=True, specs=specs)
 
-# Data viz of sales trend
-fig = px.line(sales_trend, x=sales_trend.index, y="sales")
-fig.update_layout(
-    width=1200,
-    height=500,
-    xaxis_title='',
-    yaxis_title='Sales ($)'
-)
-
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig, use_container_width=True)
-
-st.markdown("""
+    st.markdown("""
 <ul style='text-align: justify; padding: 10px;'>       
 <li>The sales have an upward trend. This trend shows a slow but consistent increase in sales over time. This indicates that, overall, there was growth in sales during this period, despite daily fluctuations.</li>
 <li>Sales have a seasonality component where sales will drop quite drastically at the end of each month and increase slightly at the beginning of the month.</li>
@@ -380,46 +497,50 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# --- Time Series Analysis: Sales Projection ---
+    # --- Time Series Analysis: Sales Projection ---
 
-st.markdown("""
+    st.markdown("""
 ### Time Series Analysis: Sales Projection
 """, unsafe_allow_html=True)
 
-# Load data dari kedua file CSV
-original_sales_df = pd.read_csv('./assets/original_sales.csv')
-forecast_sales_df = pd.read_csv('./assets/sales_forecast.csv')
-
-# Membuat line graph
-fig = go.Figure()
 
-# Menambahkan line untuk original sales
-fig.add_trace(go.Scatter(x=original_sales_df['transaction_date'], y=original_sales_df['sales'], 
-                         mode='lines', name='Original Sales', 
-                         line=dict(color='blue')))
-
-# Menambahkan line untuk forecast sales
-fig.add_trace(go.Scatter(x=forecast_sales_df['transaction_date'], y=forecast_sales_df['sales'], 
-                         mode='lines', name='Forecast Sales', 
-                         line=dict(color='red')))
-
-# Update layout
-fig.update_layout(
-     xaxis_title="",
-    yaxis_title="Sales ($)",
-)
+    # Holt-Winters fitted on the daily sales, in total and per store location, once per
+    # data version, or taken from the build artifacts
+    forecast_key = register_forecast(get_database(), sales_version)
+    history, forecast, fits = sales_forecast(forecast_key)
+    series = st.selectbox("Series", list(forecast.columns), key="projection_series")
+    chart_id = "sales_projection" if series == ALL_LOCATIONS else f"sales_projection_{series}"
 
-# Menampilkan grafik di Streamlit
-st.plotly_chart(fig)
+    # Menampilkan grafik di Streamlit
+    plotly_chart(chart_id, sales_version, lambda: sales_projection_chart(history[series], forecast[series]))
 
-st.markdown("""
+    growth = forecast[ALL_LOCATIONS].sum() / history[ALL_LOCATIONS].sum() - 1
+    st.markdown(f"""
 <p style='text-align: justify; padding: 1px;'>
-From the analysis of the sales prediction graph using the Holt-Winters model, it appears there is a consistent upward trend in sales data. Based on predictions, sales will increase by 109.09% 
+From the analysis of the sales prediction graph using the Holt-Winters model, it appears there is a consistent upward trend in sales data. Based on predictions, sales will {'increase' if growth >= 0 else 'decrease'} by {abs(growth):.2%} 
 in the next semester. Plan promotions and marketing efforts to keep customers interested and engaged. Tailor promotions around observed peak times and customer preferences gathered from sales data.
 </p> 
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    # Model chosen for each series by the grid search
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "series": name,
+                "model": fit.model,
+                "seasonality": fit.season,
+                "alpha": fit.alpha,
+                "beta": fit.beta,
+                "gamma": fit.gamma,
+                "RMSE ($)": fit.mse ** 0.5,
+            }
+            for name, fit in fits.items() if fit
+        ]),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 <b><i>The results of this forecast show an optimistic upward trend, but the following points need to be noted:</i></b>
 </p> 
@@ -431,9 +552,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# --- Recomendation ---
+    # --- Recomendation ---
 
-st.markdown("""
+    st.markdown("""
 ### Recomendation
 <p style='text-align: justify; padding: 1px;'>
 <b>Business Strategy Adjustments:</b>
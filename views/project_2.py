@@ -1,45 +1,186 @@
+"""COVID-19 case distribution page.
+
+`compute` runs every query the page needs once per data version; `render`
+only lays out the text and the cached charts, so a rerun does no data work.
+"""
 import streamlit as st
 
-# Data manipulation
-import pandas as pd
+# Data viz, imported when a chart is first built instead of on every page load
+from portfolio.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+px = lazy_import("plotly.express")
+
+# SQL query on the shared DuckDB connection
+from portfolio.db import get_database, sql
+from portfolio.figures import plotly_chart, pyplot_image
+
+# Cached dataset loading
+from portfolio.covid import COVID_PATH, case_map_html, register_covid
+from portfolio.spans import span
+from portfolio.storage import file_version
+
+# chart style of the Matplotlib charts, applied while each chart is drawn
+CHART_STYLE = 'ggplot'
+
+
+# --- DATA ---
+@st.cache_data
+@span("project_2.compute")
+def compute(version):
+    """Aggregates behind the charts, for the covid tables registered at `version`."""
+    return {
+        # One monthly series serves both trend charts
+        "monthly": sql(
+            """
+            SELECT 
+                month_year,
+                SUM(new_cases) AS total_new_cases,
+                SUM(new_deaths) AS total_new_deaths,
+                SUM(new_recovered) AS total_new_recovered
+            FROM covid_monthly
+            GROUP BY month, month_year
+            ORDER BY month
+            """
+        ),
+        "new_cases_by_location": sql(
+            """
+            SELECT 
+                island,
+                location,
+                SUM(new_cases) AS total_new_cases
+            FROM covid
+            GROUP BY island, location
+            ORDER BY island, location
+            """
+        ),
+        "cases_vs_popdens": sql(
+            """
+            SELECT 
+                location,
+                MAX(total_cases) total_cases,
+                AVG(population_density) as population_density
+            FROM covid
+            GROUP BY location
+            ORDER BY total_cases DESC
+            """
+        ),
+    }
+
+
+# --- CHARTS ---
+def plot_new_cases_per_month(monthly):
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    ax.plot(monthly['month_year'], monthly['total_new_cases'],
+            label='Total New Cases', color='blue')
+
+    plt.title('COVID New Cases per Month')
+    plt.xticks(rotation=65)
+    ax.ticklabel_format(axis='y', style='plain', useOffset=False)
+    ax.yaxis.set_major_locator(plt.MultipleLocator(100000))
+
+    plt.annotate('',  
+                 xy=(15, 1200000), 
+                 xytext=(13.9, 300000),  
+                 xycoords='data',  
+                 arrowprops=dict(arrowstyle='->', connectionstyle='arc3', color='orange', lw=2))
+
+    plt.annotate('Eid al-Fitr Celebration (May 2021)',
+                 xy=(13.3, 400000),  
+                 rotation=84.4,  
+                 va='bottom', 
+                 ha='left',
+                 fontsize=11)
+
+    plt.annotate('',  
+                 xy=(22, 1170000), 
+                 xytext=(21, 200000),  
+                 xycoords='data',  
+                 arrowprops=dict(arrowstyle='->', connectionstyle='arc3', color='orange', lw=2))
+
+    plt.annotate('Omicron Variant Wave (Jan-Feb 2022)',
+                 xy=(20.4, 250000),  
+                 rotation=85.3,  
+                 va='bottom', 
+                 ha='left',
+                 fontsize=11)
+
+    return fig
 
-# Data viz
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-import folium
 
-# SQL query
-import duckdb as db
+def plot_compare_trend(monthly):
+    fig, ax = plt.subplots(figsize= (12, 6))
 
-# SQL function
-def sql(sql_query):
-    return db.sql(sql_query).to_df()
+    ax.plot(monthly['month_year'], monthly['total_new_cases'], label= 'Total New Cases')
+    ax.plot(monthly['month_year'], monthly['total_new_deaths'], label= 'Total New Deaths')
+    ax.plot(monthly['month_year'], monthly['total_new_recovered'], label= 'Total New Recovered')
 
-# choose chart style
-import matplotlib as mpl
-mpl.style.use('ggplot')
+    ax.set_xlabel('')
+    ax.set_ylabel('')
+    ax.set_title('Total New Cases vs New Deaths vs New Recovered per Month')
+    ax.legend()
 
-st.title("COVID-19 Case Distribution and Determinants in Indonesia", anchor=False)
+    plt.xticks(rotation= 65)
+    ax.ticklabel_format(axis= 'y', style= 'plain', useOffset= False)
+    ax.yaxis.set_major_locator(plt.MultipleLocator(100000))
+    return fig
+
+
+def new_cases_by_location_chart(new_cases_by_location):
+    fig = px.sunburst(
+        new_cases_by_location,
+        path=['island', 'location'], 
+        values='total_new_cases',
+        title='Total Cases Over Time',
+        template='plotly',        
+        width=1000, 
+        height=1000
+    )
+
+    fig.update_traces(textinfo='label+percent parent') 
+    return fig
+
+
+def plot_cases_vs_popdens(cases_vs_popdens):
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+
+    ax1.bar(cases_vs_popdens['location'], cases_vs_popdens['total_cases'])
+    ax1.set_xlabel('')
+    ax1.set_ylabel('Total Cases')   
+    ax1.tick_params(axis='x', rotation=90)
 
-url = 'https://github.com/afrisiringo/COVID-19-Case-Distribution-and-Determinants-in-Indonesia/blob/main/covid_analysis.ipynb'
+    ax2 = ax1.twinx()
+    ax2.plot(cases_vs_popdens['location'], cases_vs_popdens['population_density'], color='r', marker='o')
+    ax2.set_ylabel('Average Population Density')
 
-st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
+    plt.title('Comparison of Total Cases and Population Density per Province')
+    return fig
 
-st.markdown("---")
 
-# --- BACKGROUND ---
+# --- PAGE ---
 
-st.markdown("""
+def render():
+    st.title("COVID-19 Case Distribution and Determinants in Indonesia", anchor=False)
+
+    url = 'https://github.com/afrisiringo/COVID-19-Case-Distribution-and-Determinants-in-Indonesia/blob/main/covid_analysis.ipynb'
+
+    st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    # --- BACKGROUND ---
+
+    st.markdown("""
 ### Background
 <p style='text-align: justify; padding: 1px;'>
 We are data analysts of a health organization tasked with analyzing covid data in Indonesia. This data will be used as a reference when a new outbreak such as covid occurs.
 </p>
 """, unsafe_allow_html=True)
 
-# --- OBJECTIVE ---
+    # --- OBJECTIVE ---
 
-st.markdown("""
+    st.markdown("""
 ### Objective
 <p style='text-align: justify; padding: 1px;'>
 Analyzing the trend of Covid spread in Indonesia and the influence of population density on the total number of new cases in the regions.
@@ -47,11 +188,11 @@ Analyzing the trend of Covid spread in Indonesia and the influence of population
 """, unsafe_allow_html=True)
 
 
-# --- DATASET ---
+    # --- DATASET ---
 
-url2 = 'https://drive.google.com/file/d/18VF6pcAgSax_vOxIvZ26HV3z8rD5g_6i/view?usp=sharing'
+    url2 = 'https://drive.google.com/file/d/18VF6pcAgSax_vOxIvZ26HV3z8rD5g_6i/view?usp=sharing'
 
-st.markdown("""
+    st.markdown("""
 ### Dataset
 <p style='text-align: justify; padding: 1px;'>
 The dataset contains COVID-19 data spanning from March 2020 to September 2022. The dataset is provided in this <a href='{url2}'>link</a>
@@ -59,107 +200,23 @@ The dataset contains COVID-19 data spanning from March 2020 to September 2022. T
 """, unsafe_allow_html=True)
 
 
-df = pd.read_csv('./assets/covid_19_indonesia_time_series_all.csv', parse_dates=['Date'])
-
-# Change the string format of column names to make queries easier
-df.columns = (
-    df.columns.str.lower()
-    .str.replace(' ', '_')
-    .str.replace('(', '')
-    .str.replace(')', '')
-)
+    covid_version = file_version(COVID_PATH)
 
-# drop unused columns
-df = (
-    df.drop([
-        'province',
-        'country',
-        'continent',
-    ], axis= 1)
-)
+    # Only the needed columns of the province rows are parsed, once per data version, and
+    # registered as the "covid" view together with its "covid_monthly" rollup
+    register_covid(get_database(), covid_version)
+    data = compute(covid_version)
 
-df = df[df['location_level']=='Province']
+    # --- Trend of New Cases per Month ---
 
-df = df.drop('location_level', axis=1)
-
-df = df.dropna(axis=1).reset_index(drop=True)
-
-# --- Trend of New Cases per Month ---
-
-st.markdown("""
+    st.markdown("""
 ### Trend of New Cases per Month
 """, unsafe_allow_html=True)
 
-# create data frame of new cases per month
-new_cases_per_month_num = sql(
-    """
-    WITH monthly_cases AS (
-        SELECT 
-            DATE_TRUNC('month', date) AS month,
-            SUM(new_cases) AS total_new_cases
-        FROM df
-        GROUP BY month
-        ORDER BY month
-    )
-    SELECT 
-        month,
-        total_new_cases
-    FROM monthly_cases
-    ORDER BY month
-    """
-)
-
-new_cases_per_month_name = sql(
-    """
-    SELECT 
-        STRFTIME(month, '%b %Y') AS month_year,
-        total_new_cases,
-    FROM new_cases_per_month_num
-    """
-)
-
-def plot_new_cases_per_month():
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    ax.plot(new_cases_per_month_name['month_year'], new_cases_per_month_name['total_new_cases'],
-            label='Total New Cases', color='blue')
-
-    plt.title('COVID New Cases per Month')
-    plt.xticks(rotation=65)
-    ax.ticklabel_format(axis='y', style='plain', useOffset=False)
-    ax.yaxis.set_major_locator(plt.MultipleLocator(100000))
-
-    plt.annotate('',  
-                 xy=(15, 1200000), 
-                 xytext=(13.9, 300000),  
-                 xycoords='data',  
-                 arrowprops=dict(arrowstyle='->', connectionstyle='arc3', color='orange', lw=2))
-
-    plt.annotate('Eid al-Fitr Celebration (May 2021)',
-                 xy=(13.3, 400000),  
-                 rotation=84.4,  
-                 va='bottom', 
-                 ha='left',
-                 fontsize=11)
-
-    plt.annotate('',  
-                 xy=(22, 1170000), 
-                 xytext=(21, 200000),  
-                 xycoords='data',  
-                 arrowprops=dict(arrowstyle='->', connectionstyle='arc3', color='orange', lw=2))
-
-    plt.annotate('Omicron Variant Wave (Jan-Feb 2022)',
-                 xy=(20.4, 250000),  
-                 rotation=85.3,  
-                 va='bottom', 
-                 ha='left',
-                 fontsize=11)
-
-    st.pyplot(fig)
 
-plot_new_cases_per_month()
+    pyplot_image("new_cases_per_month", covid_version, lambda: plot_new_cases_per_month(data["monthly"]), style=CHART_STYLE)
 
-st.markdown("""
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 We observe two prominent spikes in cases, occurring in May-July 2021 and January-February 2022, which we will explore further.
 <br>            
@@ -188,51 +245,14 @@ underscores the necessity for preparedness in facing potential future surges, wh
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Total New Cases vs New Deaths vs New Recovered per Month
 """, unsafe_allow_html=True)
 
-compare_trend_num = sql(
-    """
-    SELECT 
-        DATE_TRUNC('month', date) AS month,
-        SUM(new_cases) AS total_new_cases,
-        SUM(new_deaths) AS total_new_deaths,
-        SUM(new_recovered) AS total_new_recovered
-    FROM df
-    GROUP BY month
-    ORDER BY month
-    """
-)
-
-compare_trend_name = sql(
-    """
-    SELECT 
-        STRFTIME(month, '%b %Y') AS month_year,
-        total_new_cases,
-        total_new_deaths,
-        total_new_recovered
-    FROM compare_trend_num
-    """
-)
-
-fig, ax = plt.subplots(figsize= (12, 6))
-
-ax.plot(compare_trend_name['month_year'], compare_trend_name['total_new_cases'], label= 'Total New Cases')
-ax.plot(compare_trend_name['month_year'], compare_trend_name['total_new_deaths'], label= 'Total New Deaths')
-ax.plot(compare_trend_name['month_year'], compare_trend_name['total_new_recovered'], label= 'Total New Recovered')
-
-ax.set_xlabel('')
-ax.set_ylabel('')
-ax.set_title('Total New Cases vs New Deaths vs New Recovered per Month')
-ax.legend()
-
-plt.xticks(rotation= 65)
-ax.ticklabel_format(axis= 'y', style= 'plain', useOffset= False)
-ax.yaxis.set_major_locator(plt.MultipleLocator(100000))
-st.pyplot(fig)
-
-st.markdown("""
+
+    pyplot_image("compare_trend", covid_version, lambda: plot_compare_trend(data["monthly"]), style=CHART_STYLE)
+
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 <b>Second Spike: January-February 2022</b><br>
 The graph shows a strong correlation between the rise and fall of new cases and new recoveries. 
@@ -243,119 +263,46 @@ pronounced compared to the increase in cases. This could potentially be attribut
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Distribution of COVID-19 Cases in Indonesia by Location
 """, unsafe_allow_html=True)
 
-new_cases_by_location = sql(
-    """
-    SELECT 
-        island,
-        location,
-        SUM(new_cases) AS total_new_cases
-    FROM df
-    GROUP BY island, location
-    ORDER BY island, location
-    """
-)
-
-fig = px.sunburst(
-    new_cases_by_location,
-    path=['island', 'location'], 
-    values='total_new_cases',
-    title='Total Cases Over Time',
-    template='plotly',        
-    width=1000, 
-    height=1000
-)
-
-fig.update_traces(textinfo='label+percent parent') 
-
-st.plotly_chart(fig, use_container_width=True)
-
-st.markdown("""
+
+    plotly_chart("new_cases_by_location", covid_version, lambda: new_cases_by_location_chart(data["new_cases_by_location"]), use_container_width=True)
+
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 The chart reveals that the island of Java, particularly DKI Jakarta, is the most affected by COVID-19 cases in Indonesia. DKI Jakarta alone comprises 32% of the cases, the highest among all regions. Collectively, the 
 provinces on Java—including DKI Jakarta, Jawa Barat, Jawa Tengah, and Jawa Timur—account for 69% of the total cases, indicating a significant concentration of the pandemic within this island.
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Geographic Analysis
 <p style='text-align: justify; padding: 1px;'>
 To see the distribution of cases in Indonesia, we can make a map by utilizing the folium library.   
 </p>
 """, unsafe_allow_html=True)
 
-geo_data = sql(
-    """
-    SELECT
-        location,
-        MAX(total_cases) AS total_cases,
-        AVG(latitude) AS latitude,
-        AVG(longitude) AS longitude
-    FROM df
-    GROUP BY location;
-    """
-)
-
-m = folium.Map(location=[geo_data['latitude'].mean(), geo_data['longitude'].mean()], zoom_start=5)
-
-# Add markers for each province
-
-for i, row in geo_data.iterrows():
-    folium.Circle(
-        location=[row['latitude'], row['longitude']],
-        radius=row['total_cases']/5 ,  
-        color='crimson',  
-        fill=True,
-        fill_color='crimson',  
-        tooltip=f"{row['location']}: {row['total_cases']} cases",  
-    ).add_to(m)
-
-map_html = m._repr_html_()
-st.components.v1.html(map_html, height=500)
-
-st.markdown("""
+    # The map is built from one GeoJSON layer and its HTML is cached per data version
+    map_html = case_map_html(covid_version)
+    st.components.v1.html(map_html, height=500)
+
+    st.markdown("""
 ### Total Cases vs Population Density
 """, unsafe_allow_html=True)
 
-cases_vs_popdens = sql(
-    """
-    SELECT 
-        location,
-        MAX(total_cases) total_cases,
-        AVG(population_density) as population_density
-    FROM df
-    GROUP BY location
-    ORDER BY total_cases DESC
-    """
-)
-
-plt.style.use('default')
-
-fig, ax1 = plt.subplots(figsize=(12, 6))
-
-ax1.bar(cases_vs_popdens['location'], cases_vs_popdens['total_cases'])
-ax1.set_xlabel('')
-ax1.set_ylabel('Total Cases')   
-ax1.tick_params(axis='x', rotation=90)
-
-ax2 = ax1.twinx()
-ax2.plot(cases_vs_popdens['location'], cases_vs_popdens['population_density'], color='r', marker='o')
-ax2.set_ylabel('Average Population Density')
 
-plt.title('Comparison of Total Cases and Population Density per Province')
-st.pyplot(fig)
+    pyplot_image("cases_vs_popdens", covid_version, lambda: plot_cases_vs_popdens(data["cases_vs_popdens"]), style='default')
 
-st.markdown("""
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 Generally, there appears to be a correlation between population density and the number of COVID-19 cases. 
 Provinces with higher population densities tend to have more cases. This pattern suggests that transmission rates could be influenced by the population concentration. 
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Conclusion
 <p style='text-align: justify; padding: 1px;'>
 The analysis of COVID-19 data in Indonesia from March 2020 to September 2022 shows significant fluctuations in case numbers, with prominent spikes in May-July 2021 and January-February 2022. 
@@ -363,7 +310,7 @@ These increases align with major events such as Eid al-Fitr and the global emerg
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Recommendations
 <ul style='text-align: justify; padding: 10px;'>
 <li>Implement more stringent monitoring and preventive measures during and after major holidays or events like Eid al-Fitr, when increased travel and social interaction heighten the risk of virus spread.</li>
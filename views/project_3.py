@@ -1,25 +1,48 @@
+"""E-commerce app vs website page.
+
+`compute` fits the spend model and builds its coefficient table once per
+data version; `render` only lays out the text, tables and cached pair plot.
+"""
 import streamlit as st
 
-# Data manipulation
-import pandas as pd
-import numpy as np
+# Cached dataset and pair plot
+from portfolio.customers import CUSTOMERS_PATH, pairplot_png, register_customers, spend_model, spend_model_intervals
+from portfolio.db import get_database
+from portfolio.explorer import data_explorer
+from portfolio.spans import span
+from portfolio.storage import file_version
+
+
+# --- DATA ---
+@st.cache_data
+@span("project_3.compute")
+def compute(version):
+    """The spend model and its coefficient table for the customer data at `version`."""
+    # The model is fitted in the app, streaming over the customer file once per data version
+    model = spend_model(version)
+    intervals = spend_model_intervals(version)
+
+    # Create a DataFrame with the coefficients
+    df = model.coefficients.to_frame("Coefficient")
+    df["95% CI (bootstrap)"] = [f"[{lower:.2f}, {upper:.2f}]" for lower, upper in intervals.itertuples(index=False)]
+    return {"model": model, "coefficients": df}
 
-# Data viz
-import seaborn as sns
 
-# --- Title ---
-st.title("E-commerce Strategy: Invest in App or Website for Max ROI?")
+# --- PAGE ---
+def render():
+    # --- Title ---
+    st.title("E-commerce Strategy: Invest in App or Website for Max ROI?")
 
 
-url = 'https://github.com/afrisiringo/Website-vs-App/blob/main/analysis.ipynb'
+    url = 'https://github.com/afrisiringo/Website-vs-App/blob/main/analysis.ipynb'
 
-st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
+    st.markdown(f"<i>To access the full project details and source code, please click this <a href='{url}'>link</a>.</i>", unsafe_allow_html=True)
 
-st.markdown("---")
+    st.markdown("---")
 
-# --- BACKGROUND ---
+    # --- BACKGROUND ---
 
-st.markdown("""
+    st.markdown("""
 ### Background
 <p style='text-align: justify; padding: 1px;'>
 X is an Ecommerce company that sells clothing online but they also have in-store style and clothing advice sessions. Customers come in to the store, have sessions/meetings with a personal stylist, 
@@ -29,39 +52,36 @@ The company is trying to decide whether to focus their efforts on their mobile a
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("---")
+    st.markdown("---")
 
-# --- DATASET ---
+    # --- DATASET ---
 
-st.markdown("""
+    st.markdown("""
 ### Dataset
 <p style='text-align: justify; padding: 1px;'>
 The data used is information about E-commerce X's customer accounts.
 </p>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    return pd.read_csv('./assets/Ecommerce Customers')
-
-customers = load_data()
+    customers_version = file_version(CUSTOMERS_PATH)
+    register_customers(get_database(), customers_version)
 
-# Menampilkan DataFrame di Streamlit
-st.dataframe(customers)
+    # Browse the customers one page at a time, sorted and filtered in DuckDB
+    data_explorer("customers", key="customers", unique_key="Email")
 
-st.markdown("---")
+    st.markdown("---")
 
-st.markdown("""
+    st.markdown("""
 ### Relationships between the numerical features
 <p style='text-align: justify; padding: 1px;'>
 The interrelationships among numerical variables were examined by utilizing Seaborn's pairplot function.
 </p>
 """, unsafe_allow_html=True)
 
-pairplot = sns.pairplot(customers)
-st.pyplot(pairplot.fig)
+    # The scatter matrix is rendered once per data version and served as an image
+    st.image(pairplot_png(customers_version), use_container_width=True)
 
-st.markdown("""
+    st.markdown("""
 <p style='text-align: justify; padding: 1px;'>
 From this visual we can see several points of analysis:
 </p>
@@ -75,7 +95,7 @@ emphasizes the importance of retaining existing customers.</li>
 </ul>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Regression analysis
 <p style='text-align: justify; padding: 1px;'>
 To reinforce these findings and provide more targeted recommendations, regression analysis was conducted. A linear regression model was developed to predict <b>Yearly Amount Spent</b>. Subsequently, 
@@ -83,15 +103,19 @@ the coefficients of the model was analyzed to identify which features most signi
 </p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    data = compute(customers_version)
+    model = data["model"]
+    metrics = model.metrics
+
+    st.markdown(f"""
 <p style='text-align: justify; padding: 1px;'>
-After building the model, an evaluation was conducted to assess its performance. The results are as follows:
+After building the model on all {model.n_rows:,} customers, an evaluation was conducted to assess its performance. The results are as follows:
 </p>
 <ul style='text-align: justify; padding: 10px;'>       
-<li>Mean Absolute Error (MAE): 7.22</li>
-<li>Root Mean Square Error (RMSE): 8.93</li>
-<li>Mean Absolute Percentage Error (MAPE): 1.45%</li>
-<li>R-squared (R2): 98.90%</li>
+<li>Mean Absolute Error (MAE): {metrics['MAE']:.2f}</li>
+<li>Root Mean Square Error (RMSE): {metrics['RMSE']:.2f}</li>
+<li>Mean Absolute Percentage Error (MAPE): {metrics['MAPE']:.2%}</li>
+<li>R-squared (R2): {metrics['R2']:.2%}</li>
 </ul>
 <p style='text-align: justify; padding: 1px;'>
 The model has low error metrics and high R2, this indicates that the model is very effective in predicting annual spending based on the features provided.
@@ -101,28 +125,23 @@ The following is a comparison of the coefficients of the features model:
 </p>
 """, unsafe_allow_html=True)
 
-# Create a DataFrame with the coefficients
-data = {
-    "Coefficient": [25.981550, 38.590159, 0.190405, 61.279097]
-}
-index = ["Avg. Session Length", "Time on App", "Time on Website", "Length of Membership"]
-df = pd.DataFrame(data, index=index)
+    coefficients = model.coefficients
 
-# Display the DataFrame in Streamlit
-st.dataframe(df)
+    # Display the DataFrame in Streamlit
+    st.dataframe(data["coefficients"])
 
-st.markdown("""
+    st.markdown(f"""
 <p style='text-align: justify; padding: 1px;'>
 The interpretation of this value is as follows:
 </p>    
 <ul style='text-align: justify; padding: 10px;'>       
-<li>Every one unit increase in Time on App correlates to an increase of approximately 38.59 units in annual spending, demonstrating the significant impact of apps on sales.</li>
-<li>The coefficient for Time on Website is only 0.19, indicating that time spent on the website does not significantly affect customers' annual spending compared to other factors in the model.</li>
-<li>Each one-year increase in membership correlates with an increase of approximately 61.27 units in annual spending, confirming the importance of customer loyalty.</li>
+<li>Every one unit increase in Time on App correlates to an increase of approximately {coefficients['Time on App']:.2f} units in annual spending, demonstrating the significant impact of apps on sales.</li>
+<li>The coefficient for Time on Website is only {coefficients['Time on Website']:.2f}, indicating that time spent on the website does not significantly affect customers' annual spending compared to other factors in the model.</li>
+<li>Each one-year increase in membership correlates with an increase of approximately {coefficients['Length of Membership']:.2f} units in annual spending, confirming the importance of customer loyalty.</li>
 </ul>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 ### Conclusion
 <p style='text-align: justify; padding: 1px;'>
 The data shows that apps have a greater impact on annual spending growth than websites. This could be a strong argument for further development focus on the mobile app experience. Meanwhile, 